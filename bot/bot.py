@@ -12,6 +12,7 @@ from bot.handlers.on_message import handle_background_message, handle_direct_mes
 from bot.handlers.utils import (
     run_scheduler,
     daily_job,
+    prewarm_daily_assets,
     monthly_print_reminder_job,
     load_task_entry_messages,
     load_growth_photo_messages,
@@ -20,10 +21,17 @@ from bot.handlers.utils import (
     load_confirm_growth_album_messages
 )
 from bot.utils.message_tracker import (
+    DATA_DIR,
     save_confirm_growth_albums_record
 )
 from bot.utils.api_utils import APIUtils
 from bot.utils.openai_utils import OpenAIUtils
+from bot.utils.event_dedup import EventDeduplicator
+from bot.utils.event_router import EventRouter
+from bot.utils.media_pool import MediaPool
+from bot.utils.upload_cache import UploadCache
+from bot.utils.page_previews import PagePreviews
+from bot.utils.photo_hash_index import PhotoHashIndex
 from bot.views.album_select_view import BookMenuView
 from bot.views.menu_view import KnowledgeMenuView
 
@@ -43,11 +51,19 @@ class MissionBot(discord.Client):
         self.logger = setup_logger('MissionBot')
         self.openai_utils = OpenAIUtils(api_key=config.OPENAI_API_KEY)
         self.api_utils = APIUtils(api_host=config.BABY_API_HOST, api_port=config.BABY_API_PORT)
+        self.event_dedup = EventDeduplicator(window_seconds=config.EVENT_DEDUP_WINDOW_SECONDS)
+        self.event_router = EventRouter(max_workers=config.EVENT_ROUTER_WORKERS)
+        self.media_pool = MediaPool(max_workers=config.MEDIA_WORKERS, max_side=config.MEDIA_MAX_SIDE)
+        self.upload_cache = UploadCache(self.media_pool)
+        self.photo_hash_index = PhotoHashIndex(DATA_DIR / "photo_hashes")
+        self.page_previews = PagePreviews(self.media_pool, max_side=config.PAGE_PREVIEW_MAX_SIDE, quality=config.PAGE_PREVIEW_QUALITY)
 
         # variables to track user states
         self.photo_mission_replace_index = defaultdict(int)
         self.reset_baby_profile = defaultdict(int)
         self.skip_aside_text = defaultdict(int)
+        # (user_id, mission_id) -> (draft message, created_at) of a page that is still being generated
+        self.draft_previews = {}
         self.skip_growth_info = defaultdict(int)
         self.submit_deadline = 5 # Default to 5th of each month
 
@@ -129,10 +145,12 @@ class MissionBot(discord.Client):
         ):
             return
 
+        # Events of the same user are processed in order, different users in parallel
         if message.channel.id == config.BACKGROUND_LOG_CHANNEL_ID:
-            await handle_background_message(self, message)
+            lane = message.mentions[0].id if len(message.mentions) == 1 else 'background'
+            self.event_router.dispatch(lane, handle_background_message, self, message)
         elif isinstance(message.channel, discord.channel.DMChannel):
-            await handle_direct_message(self, message)
+            self.event_router.dispatch(message.author.id, handle_direct_message, self, message)
 
 def run_bot():
     if not isinstance(config.DISCORD_TOKEN, str):
@@ -141,6 +159,7 @@ def run_bot():
     client = MissionBot(config.MY_GUILD_ID)
 
     if not config.ENV:
+        schedule.every().day.at("09:30").do(lambda: asyncio.create_task(prewarm_daily_assets(client)))
         schedule.every().day.at("10:00").do(lambda: asyncio.create_task(daily_job(client)))
         schedule.every().day.at("12:30").do(lambda: asyncio.create_task(monthly_print_reminder_job(client)))
 
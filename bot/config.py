@@ -18,6 +18,39 @@ class Config:
         self.MISSION_BOT = int(os.getenv('MISSION_BOT_ID'))
         self.BABY_API_HOST = os.getenv('BABY_API_HOST')
         self.BABY_API_PORT = os.getenv('BABY_API_PORT')
+        self.EVENT_DEDUP_WINDOW_SECONDS = int(os.getenv('EVENT_DEDUP_WINDOW_SECONDS', 15))
+        self.EVENT_ROUTER_WORKERS = int(os.getenv('EVENT_ROUTER_WORKERS', 16))
+        self.OPENAI_MAX_CONCURRENCY = int(os.getenv('OPENAI_MAX_CONCURRENCY', 8))
+        # Requests per minute for each model, e.g. "gpt-4o-mini:500,whisper-1:50"
+        self.OPENAI_MODEL_RPM = {
+            model.strip(): int(rpm)
+            for model, rpm in (
+                item.split(':') for item in os.getenv('OPENAI_MODEL_RPM', 'gpt-4o-mini:500,whisper-1:50').split(',') if ':' in item
+            )
+        }
+
+        self.DRIVE_CACHE_MAX_BYTES = int(os.getenv('DRIVE_CACHE_MAX_MB', 1024)) * 1024 * 1024
+        self.DRIVE_MAX_CONCURRENCY = int(os.getenv('DRIVE_MAX_CONCURRENCY', 6))
+        self.MEDIA_WORKERS = int(os.getenv('MEDIA_WORKERS', 2))
+        # Longest side of converted photos, in pixels (print resolution of a book page)
+        self.MEDIA_MAX_SIDE = int(os.getenv('MEDIA_MAX_SIDE', 2480))
+        # Embed previews of book pages; Discord never shows them larger than this
+        self.PAGE_PREVIEW_MAX_SIDE = int(os.getenv('PAGE_PREVIEW_MAX_SIDE', 1280))
+        self.PAGE_PREVIEW_QUALITY = int(os.getenv('PAGE_PREVIEW_QUALITY', 82))
+        # Shortest side below which an uploaded photo prints visibly soft
+        self.PHOTO_MIN_SIDE = int(os.getenv('PHOTO_MIN_SIDE', 800))
+        self.AUDIO_WORKERS = int(os.getenv('AUDIO_WORKERS', 2))
+        self.AUDIO_MIN_SECONDS = float(os.getenv('AUDIO_MIN_SECONDS', 0.5))
+        self.AUDIO_MAX_SECONDS = int(os.getenv('AUDIO_MAX_SECONDS', 300))
+        self.TRANSCRIPTION_CACHE_SIZE = int(os.getenv('TRANSCRIPTION_CACHE_SIZE', 512))
+        # openai / local (offline faster-whisper) / failover (openai, then local)
+        # 'local' and 'failover' need the optional package: pip install faster-whisper
+        self.TRANSCRIPTION_BACKEND = os.getenv('TRANSCRIPTION_BACKEND', 'openai')
+        self.LOCAL_WHISPER_MODEL = os.getenv('LOCAL_WHISPER_MODEL', 'small')
+        self.TRANSCRIPTION_TIMEOUT = int(os.getenv('TRANSCRIPTION_TIMEOUT', 20))
+        # LLM result cache; set LLM_CACHE_DIR (e.g. cache/llm) to also persist entries on disk
+        self.LLM_CACHE_SIZE = int(os.getenv('LLM_CACHE_SIZE', 2048))
+        self.LLM_CACHE_DIR = os.getenv('LLM_CACHE_DIR') or None
 
         self.MISSION_BOT = int(os.getenv('MISSION_BOT_ID'))
         self.DEV_BOT_ID = int(os.getenv('DEV_BOT_ID'))
@@ -26,8 +59,15 @@ class Config:
             self.DISCORD_TOKEN = self.DISCORD_DEV_TOKEN
 
         self.IMAGE_ALLOWED_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.heic', '.heif']
+        # Opt-in: the book font (.ttf/.otf) used to print aside texts. It is not shipped with the bot;
+        # without it, line breaks use the old unit_length widths and page drafts show photos only
+        self.ASIDE_TEXT_FONT_PATH = os.getenv('ASIDE_TEXT_FONT_PATH', '')
+
+        self.PROMPT_DIR = "bot/resource/prompts"
+        self.PROMPT_AUTO_RELOAD = os.getenv('PROMPT_AUTO_RELOAD', 'true' if self.ENV else 'false').lower() == 'true'
 
         self._load_mission_config()
+        self._build_prompt_file_map()
         self.photo_mission_list = set(
             [self.baby_registration_mission] +
             self.photo_mission +
@@ -84,48 +124,39 @@ class Config:
         Get the appropriate prompt file for a mission.
         Simplified to use mission type classification.
         Mission validation logic is determined by mission_requirements.
+        The mission -> prompt map is built once in _build_prompt_file_map.
         """
-        base_path = "bot/resource/prompts"
-
-        # Registration missions
-        if mission_id in self.baby_profile_registration_missions:
-            return f"{base_path}/baby_intro_prompt.txt"
-
-        # Pregnant registration missions
-        elif mission_id == self.pregnant_registration_mission:
-            return f"{base_path}/pregnant_registration_prompt.txt"
-
-        # Letter missions
-        elif mission_id in self.letter_mission:
-            return f"{base_path}/letter_prompt.txt"
-
-        # Add-on photo missions
-        elif mission_id in self.add_on_photo_mission:
-            return f"{base_path}/add_on_mission_prompt.txt"
-
-        # General photo missions - simple aside_text with typo correction only
-        elif mission_id in self.photo_mission:
-            return f"{base_path}/aside_text_prompt.txt"
-
-        # Questionnaire missions
-        elif mission_id in self.questionnaire_mission or mission_id in self.short_answer_mission:
-            return f"{base_path}/short_answer_prompt.txt"
-
-        # Video missions
-        elif mission_id in self.video_mission:
-            return f"{base_path}/video_mission_prompt.txt"
-
-        # Audio missions
-        elif mission_id in self.audio_mission:
-            return f"{base_path}/audio_mission_prompt.txt"
-
-        # Theme missions
-        elif mission_id >= 7001 and mission_id <= 7042:
-            return f"{base_path}/short_answer_prompt.txt"
-
-        # Default fallback
-        else:
-            return f"{base_path}/class_question.txt"
+        return self.mission_prompt_files.get(mission_id, f"{self.PROMPT_DIR}/class_question.txt")
+
+    def _build_prompt_file_map(self):
+        base_path = self.PROMPT_DIR
+
+        # Ordered by priority: a mission listed in several groups uses the first match
+        prompt_groups = [
+            # Registration missions
+            (self.baby_profile_registration_missions, "baby_intro_prompt.txt"),
+            # Pregnant registration missions
+            ([self.pregnant_registration_mission], "pregnant_registration_prompt.txt"),
+            # Letter missions
+            (self.letter_mission, "letter_prompt.txt"),
+            # Add-on photo missions
+            (self.add_on_photo_mission, "add_on_mission_prompt.txt"),
+            # General photo missions - simple aside_text with typo correction only
+            (self.photo_mission, "aside_text_prompt.txt"),
+            # Questionnaire missions
+            (self.questionnaire_mission + self.short_answer_mission, "short_answer_prompt.txt"),
+            # Video missions
+            (self.video_mission, "video_mission_prompt.txt"),
+            # Audio missions
+            (self.audio_mission, "audio_mission_prompt.txt"),
+            # Theme missions
+            (range(7001, 7043), "short_answer_prompt.txt"),
+        ]
+
+        self.mission_prompt_files = {}
+        for mission_ids, prompt_file in prompt_groups:
+            for mission_id in mission_ids:
+                self.mission_prompt_files.setdefault(mission_id, f"{base_path}/{prompt_file}")
 
     def _load_mission_config(self):
         with open("bot/resource/mission_config.json", "r") as f:
@@ -127,7 +127,7 @@ async def process_add_on_mission_filling(client, message, student_mission_info):
         prompt_path = config.get_prompt_file(mission_id)
         async with message.channel.typing():
             conversations = [{'role': 'user', 'message': request_info['context']}] if request_info['context'] else None
-            mission_result = client.openai_utils.process_user_message(prompt_path, request_info['user_message'], conversations=conversations)
+            mission_result = await client.openai_utils.process_user_message(prompt_path, request_info['user_message'], conversations=conversations)
             client.logger.info(f"Assistant response: {mission_result}")
     else:
         # Skip AI prediction, use direct response
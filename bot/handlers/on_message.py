@@ -1,5 +1,6 @@
 import asyncio
 import discord
+import json
 import os
 import re
 import time
@@ -47,13 +48,24 @@ from bot.utils.message_tracker import (
     save_theme_book_edit_record,
     save_confirm_growth_albums_record
 )
-from bot.utils.drive_file_utils import create_file_from_url, create_preview_image_from_url
+from bot.utils.drive_file_utils import create_file_from_url, create_preview_image_from_url, get_drive_asset_cache
 from bot.utils.id_utils import encode_ids
+from bot.utils.page_previews import page_export_path
+from bot.utils.draft_preview import clear_draft_preview
 
 async def handle_background_message(client, message):
     client.logger.debug(f"Background message received: {message}")
     client.logger.debug(f"Message mentions: {message.mentions}")
 
+    # Operational commands without user mention
+    if message.content.strip() == 'BOT_STATS':
+        await handle_bot_stats(client, message)
+        return
+    elif message.content.strip() == 'RELOAD_PROMPTS':
+        count = client.openai_utils.prompt_cache.reload()
+        await message.channel.send(f"🔄 Reloaded {count} prompt templates")
+        return
+
     if len(message.mentions) != 1:
         return
 
@@ -63,18 +75,43 @@ async def handle_background_message(client, message):
     # Determine the environment prefix
     prefix = 'DEV_' if config.ENV else ''
 
+    # (pattern, handler, event type to deduplicate or None)
     patterns = [
-        (rf'START_MISSION_{prefix}(\d+)', handle_mission),
-        (rf'PHOTO_GENERATION_COMPLETED_{prefix}(\d+)_(\d+)', handle_photo),
-        (rf'ALBUM_GENERATION_COMPLETED_{prefix}(\d+)_(\d+)', handle_album),
-        (rf'MONTHLY_PRINT_{prefix}REMINDER', handle_notify_monthly_print_reminder_job),
+        (rf'START_MISSION_{prefix}(\d+)', handle_mission, None),
+        (rf'PHOTO_GENERATION_COMPLETED_{prefix}(\d+)_(\d+)', handle_photo, 'PHOTO_GENERATION_COMPLETED'),
+        (rf'ALBUM_GENERATION_COMPLETED_{prefix}(\d+)_(\d+)', handle_album, 'ALBUM_GENERATION_COMPLETED'),
+        (rf'MONTHLY_PRINT_{prefix}REMINDER', handle_notify_monthly_print_reminder_job, None),
     ]
-    for pattern, handler in patterns:
+    for pattern, handler, event_type in patterns:
         match = re.search(pattern, content)
         if match:
+            # Generation backends may emit the same completion event twice
+            if event_type:
+                event_id = f"{match.group(0)}:{user_id}"
+                if client.event_dedup.is_duplicate(event_id, event_type):
+                    client.logger.info(f"Drop duplicated event {event_id}")
+                    return
             await handler(client, user_id, match)
             return
 
+async def handle_bot_stats(client, message):
+    stats = {
+        'event_router': client.event_router.stats(),
+        'event_dedup': client.event_dedup.stats(),
+        'media_pool': client.media_pool.stats(),
+        'drive_cache': get_drive_asset_cache().stats(),
+        'upload_cache': client.upload_cache.stats(),
+        'page_previews': client.page_previews.stats(),
+        'photo_hash_index': client.photo_hash_index.stats(),
+        'openai_usage': client.openai_utils.usage_summary(),
+        'assistant_runs': client.openai_utils.assistant_latency_summary(),
+        'llm_cache': client.openai_utils.result_cache.stats(),
+        'transcription_cache': client.openai_utils.transcription_cache.stats(),
+        'transcription': {client.openai_utils.transcriber.name: client.openai_utils.transcriber.stats()},
+    }
+    client.logger.info(f"Bot stats: {stats}")
+    await message.channel.send(f"📊 Bot stats\n```json\n{json.dumps(stats, indent=2, ensure_ascii=False)}\n```")
+
 async def handle_mission(client, user_id, match):
     mission_id = int(match.group(1))
     if mission_id == 1000:
@@ -87,6 +124,8 @@ async def handle_mission(client, user_id, match):
 async def handle_photo(client, user_id, match):
     baby_id = int(match.group(1))
     mission_id = int(match.group(2))
+    # Build the embed-sized page before the views look for it
+    await client.page_previews.ensure(page_export_path(baby_id, mission_id))
     if mission_id < 7000:
         await handle_notify_photo_ready_job(client, user_id, baby_id, mission_id)
     else:
@@ -131,6 +170,10 @@ async def handle_direct_message(client, message):
                 client.logger.error(f"辨識語音失敗: {message}")
                 await message.channel.send("辨識語音失敗，請再說一次")
                 return
+            elif voice_message.get('error'):
+                client.logger.info(f"語音訊息未處理 ({voice_message['error']}): {message.author.id}")
+                await message.channel.send(voice_message['message'])
+                return
             else:
                 message.content = voice_message['result']
         except Exception as e:
@@ -295,6 +338,7 @@ async def handle_notify_photo_ready_job(client, user_id, baby_id, mission_id):
         await asyncio.sleep(0.5)
         file = discord.File(file_path, filename=filename)
         view.message = await user.send(embed=embed, view=view, file=file)
+        await clear_draft_preview(client, user_id, mission_id)
         # save and delete task status
         save_growth_photo_records(str(user_id), view.message.id, mission_id, result=mission_result)
         delete_task_entry_record(str(user_id), mission_id)
@@ -323,8 +367,8 @@ async def handle_notify_album_ready_job(client, user_id, baby_id, book_id):
         await asyncio.sleep(0.5)
 
         try:
-            file = discord.File(file_path, filename=filename)
-            await user.send(embed=embed, view=view, file=file)
+            files = await client.upload_cache.attach(client, embed, file_path, filename, shared=view.shared_preview)
+            await user.send(embed=embed, view=view, files=files)
         except FileNotFoundError:
             client.logger.warning(f"File not found: {file_path}, using fallback URL: {fallback_url}")
             if fallback_url:
@@ -355,6 +399,7 @@ async def handle_notify_theme_book_ready_job(client, user_id, baby_id, book_id):
             view=view,
             file=file,
         )
+        await clear_draft_preview(client, user_id, config.theme_book_mission_map[book_id][0])
         # Log the successful message send
         client.logger.info(f"Send theme book message to user {user_id}, book {book_id}")
         save_theme_book_edit_record(str(user_id), view.message.id, book_id, book_info)
@@ -416,8 +461,8 @@ async def handle_notify_album_job(client, user_id, mission_id, book_id):
         await asyncio.sleep(0.5)
 
         try:
-            file = discord.File(file_path, filename=filename)
-            view.message = await user.send(embed=embed, view=view, file=file)
+            files = await client.upload_cache.attach(client, embed, file_path, filename, shared=view.shared_preview)
+            view.message = await user.send(embed=embed, view=view, files=files)
         except FileNotFoundError:
             client.logger.warning(f"File not found: {file_path}, using fallback URL: {fallback_url}")
             if fallback_url:
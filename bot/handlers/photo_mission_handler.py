@@ -17,8 +17,10 @@ from bot.utils.message_tracker import (
     delete_mission_record,
 )
 from bot.utils.decorator import exception_handler
-from bot.utils.drive_file_utils import create_file_from_url, create_preview_image_from_url
+from bot.utils.drive_file_utils import create_preview_image_from_url, create_files_from_urls
 from bot.utils.mission_instruction_utils import get_mission_instruction
+from bot.utils.draft_preview import start_draft_preview
+from bot.utils.photo_quality import start_photo_checks
 from bot.config import config
 
 async def handle_photo_mission_start(client, user_id, mission_id, send_weekly_report=1):
@@ -91,6 +93,9 @@ async def process_photo_mission_filling(client, message, student_mission_info):
     # Get mission_result from direct_response (handle_text_input is now self-contained)
     mission_result = request_info.get('direct_response', {})
 
+    # Quality and duplicate warnings arrive on their own, without holding up the next step
+    start_photo_checks(client, message.channel, user_id, student_mission_info.get('book_id'), mission_id, message.attachments, mission_result)
+
     # Determine next step using the new function
     next_step_type, step_index = determine_next_step(mission_id, mission_result)
     client.logger.info(f"Next step: {next_step_type}, index: {step_index}")
@@ -216,11 +221,12 @@ async def handle_text_input(client, mission_id, saved_result, message):
     
     client.logger.info(f"Assistant Input:\nprompt_path: {prompt_path}\nuser_message: {user_message}\nadditional_context: {additional_context}\nconversations: {conversations}")
     async with message.channel.typing():
-        mission_result = client.openai_utils.process_user_message(
+        mission_result = await client.openai_utils.process_user_message(
             prompt_path,
             user_message,
             conversations=conversations,
-            additional_context=additional_context
+            additional_context=additional_context,
+            cache_namespace='photo'
         )
         client.logger.info(f"Assistant response: {mission_result}")
 
@@ -240,15 +246,14 @@ async def handle_text_input(client, mission_id, saved_result, message):
 
         # 2. General photo missions: normalize and check line limit (max 2 lines)
         else:
-            from bot.utils.openai_utils import normalize_aside_text, line_count
-            processed_text = normalize_aside_text(aside_text)
-            client.logger.info(f"Processed aside text: {processed_text}, line count: {line_count(processed_text)}")
-
-            if line_count(processed_text) > 2:
+            from bot.utils.openai_utils import normalize_aside_text, aside_text_fits
+            if not aside_text_fits(aside_text, 2):
                 saved_result['message'] = "⚠️ 文字超過 2 行，請縮短或調整至 30 字或 2 行以內。"
                 # Save mission_record with warning but don't store aside_text
                 save_mission_record(user_id, mission_id, saved_result)
                 return saved_result
+            processed_text = normalize_aside_text(aside_text)
+            client.logger.info(f"Processed aside text: {processed_text}")
 
         required_aside_text_count = config.get_required_aside_text_count(mission_id, 'aside_text')
         current_aside_text_count = len([t for t in saved_result.get('aside_texts', []) if t is not None])
@@ -503,6 +508,8 @@ async def submit_photo_mission(client, message, student_mission_info, mission_re
             embed = get_waiting_embed()
             await message.channel.send(embed=embed)
 
+        # Compose a local draft of the page while the real one is generated
+        start_draft_preview(client, message.channel, user_id, mission_id, attachments, "\n".join(filter(None, aside_texts)))
         await client.api_utils.submit_generate_photo_request(user_id, mission_id)
         client.logger.info(f"送出繪本任務 {mission_id}")
 
@@ -606,11 +613,7 @@ async def build_photo_mission_embed(mission_info=None, baby_info=None, book_info
 
     files = []
     if step_index == 0 and '週' in mission_info.get('development_week'):
-        for url in mission_info['milestone_image_contents'].split(','):
-            if url.strip():
-                file = await create_file_from_url(url.strip())
-                if file:
-                    files.append(file)
+        files = await create_files_from_urls(mission_info['milestone_image_contents'])
 
     return embed, files
 
@@ -44,7 +44,7 @@ async def process_pregnancy_registration_message(client, message, student_missio
 
     # getting assistant reply
     async with message.channel.typing():
-        mission_result = client.openai_utils.process_user_message(prompt_path, message.content)
+        mission_result = await client.openai_utils.process_user_message(prompt_path, message.content)
 
     if mission_result.get('is_ready', False) == False:
         await message.channel.send(mission_result['message'])
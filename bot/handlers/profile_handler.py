@@ -17,6 +17,7 @@ from bot.utils.message_tracker import (
 )
 from bot.utils.decorator import exception_handler
 from bot.utils.drive_file_utils import create_file_from_url, create_preview_image_from_url
+from bot.utils.profile_parser import parse_baby_profile, gender_form_value
 from bot.config import config
 
 async def handle_registration_mission_start(client, user_id, mission_id):
@@ -67,8 +68,17 @@ async def handle_registration_mission_start(client, user_id, mission_id):
         embed = get_baby_name_en_registration_embed(mission_info, baby_info.get('gender'))
         await user.send(embed=embed)
     else:
+        # Typing the answers still works; the form does it in one step
+        baby_info = await client.api_utils.get_baby_profile(user_id) or {}
+        prefill = {
+            'baby_name': baby_info.get('baby_name'),
+            'birthday': baby_info.get('birthdate') or baby_info.get('birthday'),
+            'gender': gender_form_value(baby_info.get('gender')),
+        }
         embed = get_baby_registration_embed(client.reset_baby_profile.get(user_id, False))
-        await user.send(embed=embed)
+        view = TaskSelectView(client, "baby_registration_form", mission_id, mission_result=prefill)
+        view.message = await user.send(embed=embed, view=view)
+        save_task_entry_record(user_id, str(view.message.id), "baby_registration_form", mission_id, result=prefill)
 
     return
 
@@ -99,7 +109,7 @@ async def process_baby_profile_filling(client, message, student_mission_info):
         prompt_path = config.get_prompt_file(mission_id)
         async with message.channel.typing():
             conversations = [{'role': 'user', 'message': request_info['context']}] if request_info['context'] else None
-            mission_result = client.openai_utils.process_user_message(prompt_path, request_info['user_message'], conversations=conversations)
+            mission_result = await client.openai_utils.process_user_message(prompt_path, request_info['user_message'], conversations=conversations)
             client.logger.info(f"Assistant response: {mission_result}")
     else:
         # Skip AI prediction, use direct response
@@ -132,6 +142,37 @@ async def process_baby_profile_filling(client, message, student_mission_info):
         await message.channel.send(mission_result['message'])
     return
 
+async def process_baby_profile_form(client, interaction, mission_id, form_result):
+    """Handle a validated BabyRegistrationModal submission; returns True once the profile is saved."""
+    user_id = str(interaction.user.id)
+    message = SimpleNamespace(author=interaction.user, channel=interaction.channel, content=None)
+    student_mission_info = await client.api_utils.get_student_mission_status(user_id, mission_id)
+    student_mission_info['user_id'] = user_id
+
+    saved_result = get_mission_record(user_id, mission_id)
+    saved_result.update(form_result)
+    skip_growth_info = not any(form_result.get(field) for field in ['height', 'weight', 'head_circumference'])
+    client.skip_growth_info[user_id] = skip_growth_info
+    mission_result = client.openai_utils.process_baby_profile_validation(mission_id, saved_result, skip_growth_info)
+    save_mission_record(user_id, mission_id, mission_result)
+
+    # submit_baby_data already tells the user when saving fails
+    if not await submit_baby_data(client, message, student_mission_info, mission_result):
+        return False
+
+    if mission_result.get('is_ready'):
+        # Photo was already uploaded earlier in the chat flow
+        await submit_image_data(client, message, student_mission_info, mission_result)
+        await client.api_utils.submit_generate_photo_request(user_id, mission_id)
+        client.logger.info(f"送出繪本任務 {mission_id}")
+        return True
+
+    student_mission_info['current_step'] = 2
+    await client.api_utils.update_student_mission_status(**student_mission_info)
+    await interaction.followup.send(embed=get_baby_data_confirmation_embed(mission_result))
+    await handle_baby_photo_upload(client, message, student_mission_info)
+    return True
+
 async def prepare_api_request(client, message, student_mission_info):
     user_id = str(message.author.id)
     mission_id = student_mission_info['mission_id']
@@ -157,6 +198,22 @@ async def prepare_api_request(client, message, student_mission_info):
     saved_result['gender'] = saved_result.get('gender', baby_info.get('gender', None))
     saved_result['birthday'] = saved_result.get('birthday', baby_info.get('birthday', None))
 
+    # Fast path: plainly formatted answers (dates, 50cm, 3200g, ...) don't need the LLM
+    if mission_id in config.baby_name_en_registration_missions:
+        expect_name = not saved_result.get('baby_name_en')
+    else:
+        expect_name = not saved_result.get('baby_name')
+    parsed_fields = parse_baby_profile(user_message, expect_name=expect_name)
+    if parsed_fields:
+        client.logger.info(f"Parsed baby profile locally for {user_id}: {parsed_fields}")
+        saved_result.update(parsed_fields)
+        saved_result['message'] = get_missing_profile_message(mission_id, saved_result)
+        return {
+            'needs_ai_prediction': False,
+            'direct_action': 'local_parse',
+            'direct_response': saved_result
+        }
+
     # Build full context for AI prediction
     context_parts = []
     if saved_result.get('baby_name'):
@@ -184,6 +241,25 @@ async def prepare_api_request(client, message, student_mission_info):
         'user_message': user_message
     }
 
+def get_missing_profile_message(mission_id, profile):
+    labels = {
+        'baby_name': '名字',
+        'baby_name_en': '英文名字',
+        'birthday': '生日',
+        'gender': '性別',
+    }
+    if mission_id in config.baby_pre_registration_mission:
+        required = ['baby_name']
+    elif mission_id in config.baby_name_en_registration_missions:
+        required = ['baby_name_en', 'gender']
+    else:
+        required = ['baby_name', 'birthday', 'gender']
+
+    missing = [labels[field] for field in required if not profile.get(field)]
+    if missing:
+        return f"收到囉！請再告訴我寶寶的{'、'.join(missing)}呦！"
+    return "收到囉！"
+
 # --------------------- Event Handlers ---------------------
 async def submit_image_data(client, message, student_mission_info, mission_result):
     user_id = str(message.author.id)
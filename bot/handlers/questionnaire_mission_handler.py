@@ -20,7 +20,7 @@ from bot.utils.message_tracker import (
     delete_mission_record,
 )
 from bot.handlers.utils import get_user_id
-from bot.utils.drive_file_utils import create_file_from_url, create_preview_image_from_url
+from bot.utils.drive_file_utils import create_preview_image_from_url, create_files_from_urls
 from bot.utils.mission_instruction_utils import get_mission_instruction, get_current_mission_step, get_mission_total_steps
 from bot.config import config
 
@@ -179,7 +179,7 @@ async def process_questionnaire_mission_filling(client, message, student_mission
         async with message.channel.typing():
             prompt_path = config.get_prompt_file(mission_id)
             conversations = [{'role': 'user', 'message': request_info['context']}] if request_info['context'] else None
-            mission_result = client.openai_utils.process_user_message(
+            mission_result = await client.openai_utils.process_user_message(
                 prompt_path,
                 request_info['user_message'],
                 conversations=conversations,
@@ -474,11 +474,7 @@ async def build_questionnaire_mission_embed(questionnaire_data, mission_info, ba
 
     files = []
     if '週' in mission_info.get('development_week'):
-        for url in mission_info['milestone_image_contents'].split(','):
-            if url.strip():
-                file = await create_file_from_url(url.strip())
-                if file:
-                    files.append(file)
+        files = await create_files_from_urls(mission_info['milestone_image_contents'])
 
     return embed, files
 
@@ -522,11 +518,7 @@ async def build_short_answer_mission_embed(answer_data, mission_info, baby_info=
 
     files = []
     if '週' in mission_info.get('development_week', ''):
-        for url in mission_info.get('milestone_image_contents', '').split(','):
-            if url.strip():
-                file = await create_file_from_url(url.strip())
-                if file:
-                    files.append(file)
+        files = await create_files_from_urls(mission_info.get('milestone_image_contents', ''))
 
     return embed, files
 
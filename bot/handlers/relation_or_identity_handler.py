@@ -16,7 +16,7 @@ from bot.utils.message_tracker import (
     delete_mission_record,
 )
 from bot.utils.decorator import exception_handler
-from bot.utils.drive_file_utils import create_file_from_url, create_preview_image_from_url
+from bot.utils.drive_file_utils import create_preview_image_from_url, create_files_from_urls
 from bot.utils.mission_instruction_utils import get_mission_instruction
 from bot.config import config
 
@@ -62,7 +62,7 @@ async def process_relation_identity_filling(client, message, student_mission_inf
         prompt_path = config.get_prompt_file(mission_id)
         async with message.channel.typing():
             conversations = [{'role': 'user', 'message': request_info['context']}] if request_info['context'] else None
-            mission_result = client.openai_utils.process_user_message(prompt_path, request_info['user_message'], conversations=conversations)
+            mission_result = await client.openai_utils.process_user_message(prompt_path, request_info['user_message'], conversations=conversations)
             client.logger.info(f"Assistant response: {mission_result}")
     else:
         # Skip AI prediction, use direct response
@@ -206,11 +206,7 @@ async def build_photo_mission_embed(mission_info=None, baby_info=None):
 
     files = []
     if '週' in mission_info.get('development_week'):
-        for url in mission_info['milestone_image_contents'].split(','):
-            if url.strip():
-                file = await create_file_from_url(url.strip())
-                if file:
-                    files.append(file)
+        files = await create_files_from_urls(mission_info['milestone_image_contents'])
 
     return embed, files
 
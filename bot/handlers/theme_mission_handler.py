@@ -4,9 +4,6 @@ import discord
 import os
 import re
 import json
-from PIL import Image
-import pillow_heif
-import io
 import requests
 from types import SimpleNamespace
 from datetime import datetime, date
@@ -26,6 +23,8 @@ from bot.utils.message_tracker import (
 from bot.utils.decorator import exception_handler
 from bot.utils.drive_file_utils import create_file_from_url
 from bot.utils.mission_instruction_utils import get_mission_instruction
+from bot.utils.draft_preview import start_draft_preview
+from bot.utils.photo_quality import start_photo_checks
 from bot.config import config
 
 async def handle_theme_mission_start(client, user_id, mission_id):
@@ -161,6 +160,10 @@ async def process_theme_mission_filling(client, message, student_mission_info):
         return
 
     mission_result = result.get('mission_result', {})
+
+    # Quality and duplicate warnings arrive on their own, without holding up the next step
+    start_photo_checks(client, message.channel, user_id, book_id, mission_id, message.attachments, mission_result)
+
     is_photo_replacement = result.get('is_photo_replacement', False)
 
     # Handle photo replacement cleanup
@@ -391,6 +394,13 @@ async def handle_text_input(client, mission_id, book_id, saved_result, message):
         save_mission_record(user_id, mission_id, saved_result)
         return saved_result
 
+    # Batch mode: one answer per line fills the remaining questions with a single LLM call.
+    # Only when the lines match the empty questions; otherwise a multi-line reply is one caption.
+    empty_indexes = get_empty_aside_text_indexes(mission_id, saved_result)
+    batch_answers = split_batch_answers(user_message)
+    if len(empty_indexes) > 1 and len(batch_answers) == len(empty_indexes):
+        return await handle_batch_text_input(client, mission_id, saved_result, message, batch_answers)
+
     # Handle aside_text questions
     current_aside_text_count = len([t for t in saved_result.get('aside_texts', []) if t is not None])
     current_question_index = saved_result.get('current_question_index', current_aside_text_count)
@@ -420,11 +430,12 @@ async def handle_text_input(client, mission_id, book_id, saved_result, message):
 
     client.logger.info(f"Assistant Input:\nprompt_path: {prompt_path}\nuser_message: {user_message}\nadditional_context: {additional_context}\nconversations: {conversations}")
     async with message.channel.typing():
-        mission_result = client.openai_utils.process_user_message(
+        mission_result = await client.openai_utils.process_user_message(
             prompt_path,
             user_message,
             conversations=conversations,
-            additional_context=additional_context
+            additional_context=additional_context,
+            cache_namespace='theme'
         )
         client.logger.info(f"Assistant response: {mission_result}")
 
@@ -457,6 +468,65 @@ async def handle_text_input(client, mission_id, book_id, saved_result, message):
     save_mission_record(user_id, mission_id, saved_result)
     return saved_result
 
+def split_batch_answers(user_message):
+    """Split a multi-line reply into answers, dropping list numbering like `1.` or `2、`."""
+    answers = []
+    for line in user_message.splitlines():
+        line = re.sub(r'^\s*(?:\d+|[一二三四五六])\s*[.、:：)）]\s*', '', line).strip()
+        if line:
+            answers.append(line)
+    return answers
+
+def get_empty_aside_text_indexes(mission_id, saved_result):
+    """Indexes of the questions that have no aside text yet."""
+    required_aside_text_count = config.get_required_aside_text_count(mission_id, 'aside_text')
+    aside_texts = saved_result.get('aside_texts') or []
+    return [i for i in range(required_aside_text_count) if i >= len(aside_texts) or not aside_texts[i]]
+
+async def handle_batch_text_input(client, mission_id, saved_result, message, answers):
+    """
+    Correct several aside texts with one LLM call.
+    `answers` has one entry per unanswered question, filled in order; rejected answers leave their slot empty.
+    """
+    user_id = str(message.author.id)
+    required_aside_text_count = config.get_required_aside_text_count(mission_id, 'aside_text')
+    empty_indexes = get_empty_aside_text_indexes(mission_id, saved_result)
+    aside_texts = saved_result.setdefault('aside_texts', [])
+    while len(aside_texts) < required_aside_text_count:
+        aside_texts.append(None)
+
+    instruction_data = get_mission_instruction(mission_id, step_index=0, instruction_type='question')
+    if instruction_data and instruction_data.get('question'):
+        additional_context = f"Question: {instruction_data['question']}"
+    else:
+        additional_context = "任務：請根據問題擷取需要的答案，只修正明顯的錯字和標點符號，保持原文語氣和內容不變。"
+
+    prompt_path = f"{config.PROMPT_DIR}/batch_short_answer_prompt.txt"
+    user_input = json.dumps(answers, ensure_ascii=False)
+    client.logger.info(f"Assistant Input (batch):\nprompt_path: {prompt_path}\nuser_message: {user_input}\nadditional_context: {additional_context}")
+    async with message.channel.typing():
+        mission_result = await client.openai_utils.process_user_message(
+            prompt_path,
+            user_input,
+            additional_context=additional_context,
+            cache_namespace='theme_batch'
+        )
+        client.logger.info(f"Assistant response: {mission_result}")
+
+    corrected = mission_result.get('aside_texts')
+    if not isinstance(corrected, list) or len(corrected) != len(answers):
+        saved_result['message'] = "無法辨識您的答案，請一行輸入一個答案，或一次回答一題喔！"
+        save_mission_record(user_id, mission_id, saved_result)
+        return saved_result
+
+    for index, aside_text in zip(empty_indexes, corrected):
+        if aside_text and str(aside_text).strip() not in ["", "null"]:
+            aside_texts[index] = str(aside_text).strip()
+
+    saved_result['message'] = mission_result.get('message') or "已記錄您的答案！"
+    save_mission_record(user_id, mission_id, saved_result)
+    return saved_result
+
 # --------------------- Mission Flow Functions ---------------------
 def determine_next_step(mission_id, book_id, mission_result):
     """
@@ -502,7 +572,9 @@ def determine_next_step(mission_id, book_id, mission_result):
     # Count only attachments with valid urls
     attachments = mission_result.get('attachments', [])
     current_photo_count = len([a for a in attachments if a and a.get('url')])
-    current_aside_text_count = len([t for t in mission_result.get('aside_texts', []) if t is not None and str(t).strip()])
+    aside_texts = mission_result.get('aside_texts', [])
+    answered = [i < len(aside_texts) and aside_texts[i] is not None and str(aside_texts[i]).strip() != '' for i in range(required_aside_text_count)]
+    current_aside_text_count = sum(answered)
 
     # Step 3: Upload all 6 photos
     if current_photo_count < required_photo_count:
@@ -512,7 +584,8 @@ def determine_next_step(mission_id, book_id, mission_result):
     if book_id in [13, 14, 15, 16]:
         # Step 4: Answer questions for all photos
         if current_aside_text_count < required_aside_text_count:
-            return 'question', current_aside_text_count
+            # First unanswered question; batch answers may leave gaps
+            return 'question', answered.index(False)
 
     # All steps completed
     return None, None
@@ -642,6 +715,9 @@ async def submit_theme_mission(client, message, student_mission_info, mission_re
         embed = get_waiting_embed(waiting_time='long')
         await message.channel.send(embed=embed)
 
+        # Compose a local draft of the cover while the book is generated
+        start_draft_preview(client, message.channel, user_id, mission_id, [cover], mission_result.get('baby_name'))
+
         # Update all mission statuses to completed (cover + 6 content missions)
         for i in range(photo_count + 1):
             submit_mission_id = mission_id + i
@@ -695,43 +771,13 @@ def extract_attachment_info(attachment_url: str, photo_index: int=0) -> Optional
 
 async def convert_heic_to_jpg_attachment(client, heic_attachment):
     try:
-        # you need to revised the request to fetch the heic image using async ways
-        async with client.session.get(heic_attachment['url']) as response:
-            heic_content = await response.read()
-
         client.logger.info(f"開始轉換 HEIC 檔案: {heic_attachment['filename']}")
-        heic_data = io.BytesIO(heic_content)
-        heif_file = pillow_heif.read_heif(heic_data)
-        image = Image.frombytes(
-            heif_file.mode,
-            heif_file.size,
-            heif_file.data,
-            "raw",
-        )
-
-        # convert to JPEG
-        jpg_buffer = io.BytesIO()
-        image.save(jpg_buffer, format='JPEG', quality=85)
-        jpg_buffer.seek(0)
-
-        # post to upload_data channel
-        background_channel = client.get_channel(int(config.FILE_UPLOAD_CHANNEL_ID))
-        if background_channel is None or not isinstance(background_channel, discord.TextChannel):
-            raise Exception('Invalid channel')
-
-        jpg_filename = heic_attachment['filename'].replace('.heic', '.jpg').replace('.heif', '.jpg')
-        jpg_file = discord.File(jpg_buffer, filename=jpg_filename)
-        jpg_message = await background_channel.send(file=jpg_file)
-        client.logger.info(f"HEIC 轉換成功，JPG 訊息 ID: {jpg_message.id}")
-        return {
-            "photo_index": heic_attachment['photo_index'],
-            "id": jpg_message.attachments[0].id,
-            "filename": jpg_message.attachments[0].filename,
-            "url": jpg_message.attachments[0].url
-        }
+        jpg_attachment = await client.media_pool.convert_heic_attachment(client, heic_attachment)
+        client.logger.info(f"HEIC 轉換成功，JPG 附件 ID: {jpg_attachment['id']}")
+        return jpg_attachment
 
     except Exception as e:
-        print(f"HEIC 轉換失敗: {e}")
+        client.logger.error(f"HEIC 轉換失敗: {e}")
         return None
 
 # --------------------- Mission Status Loader ---------------------
@@ -907,6 +953,8 @@ def get_question_embed_with_photo(mission_info, mission_result, instruction_data
         color=0xeeb2da,
     )
     embed.set_author(name=f"✍️ {mission_info.get('milestone_domain', '主題繪本')} ({photo_index}/6)")
+    if photo_index == 1:
+        embed.set_footer(text="💡 也可以一次輸入所有照片的答案，一行一個")
 
     # IMPORTANT: Show the photo for this question
     attachments = mission_result.get('attachments', [])
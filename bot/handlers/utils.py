@@ -8,6 +8,7 @@ import traceback
 from discord.ui import View, Button
 
 from bot.config import config
+from bot.utils.drive_file_utils import prefetch_drive_assets
 from bot.utils.message_tracker import (
     load_task_entry_records,
     load_growth_photo_records,
@@ -48,6 +49,27 @@ async def daily_job(client):
         except Exception as e:
             client.logger.error(f"Failed to send control panel to user: {user_id}, {str(e)}")
 
+async def prewarm_daily_assets(client):
+    """Download the weekly report images of today's missions, so `daily_job` serves them from disk."""
+    if config.ENV:
+        return
+
+    client.logger.debug('Pre-warming daily mission assets...')
+    student_list = await client.api_utils.get_all_students_mission_notifications()
+    mission_ids = {mission['mission_id'] for mission in student_list or []}
+
+    urls = []
+    for mission_id in mission_ids:
+        try:
+            mission_info = await client.api_utils.get_mission_info(mission_id)
+            if mission_info and '週' in mission_info.get('development_week', ''):
+                urls.extend(mission_info.get('milestone_image_contents', '').split(','))
+        except Exception as e:
+            client.logger.warning(f"Failed to resolve assets of mission {mission_id}: {e}")
+
+    ready = await prefetch_drive_assets(urls)
+    client.logger.info(f"Pre-warmed {ready} assets for {len(mission_ids)} missions")
+
 async def monthly_print_reminder_job(client):
     if config.ENV:
         return
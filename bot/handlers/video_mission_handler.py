@@ -16,7 +16,7 @@ from bot.utils.message_tracker import (
     delete_mission_record,
 )
 from bot.utils.decorator import exception_handler
-from bot.utils.drive_file_utils import create_file_from_url, create_preview_image_from_url
+from bot.utils.drive_file_utils import create_preview_image_from_url, create_files_from_urls
 from bot.utils.mission_instruction_utils import get_mission_instruction
 from bot.config import config
 
@@ -176,10 +176,11 @@ async def handle_text_input(client, mission_id, saved_result, message):
     # Call AI to process the response
     async with message.channel.typing():
         conversations = [{'role': 'user', 'message': context}] if context else None
-        mission_result = client.openai_utils.process_user_message(
+        mission_result = await client.openai_utils.process_user_message(
             prompt_path,
             user_message,
-            conversations=conversations
+            conversations=conversations,
+            cache_namespace='video'
         )
         client.logger.info(f"AI response: {mission_result}")
 
@@ -395,11 +396,7 @@ async def build_video_mission_embed(mission_info=None, baby_info=None, photo_mis
 
     files = []
     if step_index == 0 and '週' in mission_info.get('development_week'):
-        for url in mission_info['milestone_image_contents'].split(','):
-            if url.strip():
-                file = await create_file_from_url(url.strip())
-                if file:
-                    files.append(file)
+        files = await create_files_from_urls(mission_info['milestone_image_contents'])
 
     return embed, files
 
@@ -0,0 +1,84 @@
+import asyncio
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from bot.config import config
+
+# Containers the transcription API accepts as-is
+TRANSCRIPTION_FORMATS = {'.flac', '.m4a', '.mp3', '.mp4', '.mpeg', '.mpga', '.oga', '.ogg', '.wav', '.webm'}
+
+_executor = None
+
+def get_audio_executor():
+    """Process pool for ffmpeg decoding, created on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=config.AUDIO_WORKERS)
+    return _executor
+
+def transcode_to_mp3(data: bytes, source_format: str) -> bytes:
+    """Decode `data` and re-encode it as mp3. Runs inside the process pool."""
+    from pydub import AudioSegment
+
+    audio = AudioSegment.from_file(io.BytesIO(data), format=source_format or None)
+    output = io.BytesIO()
+    audio.export(output, format='mp3')
+    return output.getvalue()
+
+async def prepare_audio_for_transcription(data: bytes, filename: str):
+    """
+    Return (bytes, filename) ready for upload.
+    Accepted containers are passed through untouched; anything else is
+    converted to mp3 in the process pool so the event loop never blocks.
+    """
+    name, ext = os.path.splitext(filename.lower())
+    if ext in TRANSCRIPTION_FORMATS:
+        return data, filename
+
+    loop = asyncio.get_running_loop()
+    mp3_data = await loop.run_in_executor(get_audio_executor(), transcode_to_mp3, data, ext.lstrip('.'))
+    return mp3_data, f"{os.path.basename(name)}.mp3"
+
+def probe_duration(data: bytes, filename: str):
+    """
+    Read the clip duration in seconds from the container header, without decoding.
+    Supports Ogg (Opus / Vorbis) and WAV; returns None when unknown.
+    """
+    ext = os.path.splitext(filename.lower())[1]
+    try:
+        if ext in ('.ogg', '.oga', '.opus') and data[:4] == b'OggS':
+            return _probe_ogg_duration(data)
+        if ext == '.wav' and data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+            return _probe_wav_duration(data)
+    except (IndexError, ValueError, ZeroDivisionError):
+        return None
+    return None
+
+def _probe_ogg_duration(data: bytes):
+    # The granule position of the last page is the total sample count
+    last_page = data.rfind(b'OggS')
+    while last_page > 0 and data[last_page + 4] != 0:
+        # Capture pattern inside packet data, not a page header
+        last_page = data.rfind(b'OggS', 0, last_page)
+    granule = int.from_bytes(data[last_page + 6:last_page + 14], 'little')
+
+    opus_head = data.find(b'OpusHead')
+    if opus_head != -1:
+        # Opus granules always count 48 kHz samples, including the encoder pre-skip
+        pre_skip = int.from_bytes(data[opus_head + 10:opus_head + 12], 'little')
+        return max(0, granule - pre_skip) / 48000
+
+    vorbis_head = data.find(b'\x01vorbis')
+    if vorbis_head != -1:
+        sample_rate = int.from_bytes(data[vorbis_head + 12:vorbis_head + 16], 'little')
+        return granule / sample_rate
+    return None
+
+def _probe_wav_duration(data: bytes):
+    byte_rate = int.from_bytes(data[28:32], 'little')
+    data_chunk = data.find(b'data', 12)
+    if data_chunk == -1:
+        return None
+    data_size = int.from_bytes(data[data_chunk + 4:data_chunk + 8], 'little')
+    return data_size / byte_rate
@@ -0,0 +1,99 @@
+import asyncio
+import io
+import os
+import time
+
+import discord
+
+from bot.config import config
+from bot.utils.media_pool import compose_draft_page
+from bot.utils.openai_utils import normalize_aside_text
+
+# Drafts whose real page never arrived (generation failed) are dropped after this long
+DRAFT_TTL_SECONDS = 30 * 60
+
+# Detached draft tasks are referenced here so they are not garbage-collected mid-run
+_draft_tasks = set()
+
+def start_draft_preview(client, channel, user_id, mission_id, attachments, aside_text=None):
+    """Compose and send the draft in the background, so the user's event lane is not held."""
+    task = asyncio.create_task(send_draft_preview(client, channel, user_id, mission_id, attachments, aside_text))
+    _draft_tasks.add(task)
+    task.add_done_callback(_draft_tasks.discard)
+
+async def _delete_quietly(message):
+    try:
+        await message.delete()
+    except discord.HTTPException:
+        pass
+
+def _expire_later(client, key, message):
+    """Delete `message` after DRAFT_TTL_SECONDS unless the real page replaced it first."""
+    def expire():
+        entry = client.draft_previews.get(key)
+        if entry is None or entry[0] is not message:
+            return
+        del client.draft_previews[key]
+        task = asyncio.create_task(_delete_quietly(message))
+        _draft_tasks.add(task)
+        task.add_done_callback(_draft_tasks.discard)
+
+    asyncio.get_running_loop().call_later(DRAFT_TTL_SECONDS, expire)
+
+async def _expire_drafts(client):
+    now = time.monotonic()
+    expired = [key for key, (_, created_at) in client.draft_previews.items() if now - created_at > DRAFT_TTL_SECONDS]
+    for key in expired:
+        message, _ = client.draft_previews.pop(key)
+        if message is not None:
+            await _delete_quietly(message)
+
+async def send_draft_preview(client, channel, user_id, mission_id, attachments, aside_text=None):
+    """
+    Show a locally composed approximation of the page right after submission.
+    The message is remembered so the real render can replace it; failures only skip the draft.
+    """
+    await _expire_drafts(client)
+
+    urls = [attachment['url'] for attachment in attachments if attachment and attachment.get('url')]
+    if not urls and not os.path.exists(config.ASIDE_TEXT_FONT_PATH):
+        # Without the book font the text band is dropped, leaving nothing to show
+        return
+
+    key = (str(user_id), mission_id)
+    # Pending; clear_draft_preview removes the key if the real page wins the race
+    client.draft_previews[key] = (None, time.monotonic())
+    try:
+        photos = await asyncio.gather(*(client.media_pool.fetch(url) for url in urls))
+        lines = normalize_aside_text(aside_text).split('\n') if aside_text else []
+        data = await client.media_pool.run(compose_draft_page, list(photos), lines, 1024, config.ASIDE_TEXT_FONT_PATH)
+
+        filename = f"draft_{mission_id}.jpg"
+        embed = discord.Embed(
+            title="👀 搶先看：頁面草稿",
+            description="正式版繪本頁面製作中，完成後會自動替換這張草稿喔！",
+            color=0xeeb2da,
+        )
+        embed.set_image(url=f"attachment://{filename}")
+        if key not in client.draft_previews:
+            return
+        message = await channel.send(embed=embed, file=discord.File(io.BytesIO(data), filename=filename))
+        if key in client.draft_previews:
+            client.draft_previews[key] = (message, client.draft_previews[key][1])
+            # The user may never submit again, so the draft cannot wait for the next sweep
+            _expire_later(client, key, message)
+        else:
+            await message.delete()
+    except Exception as e:
+        client.draft_previews.pop(key, None)
+        client.logger.warning(f"Failed to send draft preview for user {user_id}, mission {mission_id}: {e}")
+
+async def clear_draft_preview(client, user_id, mission_id):
+    """Remove the draft once the final page has been generated."""
+    message, _ = client.draft_previews.pop((str(user_id), mission_id), (None, None))
+    if message is None:
+        return
+    try:
+        await message.delete()
+    except discord.HTTPException as e:
+        client.logger.info(f"Draft preview of user {user_id}, mission {mission_id} already gone: {e}")
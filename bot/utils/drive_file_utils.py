@@ -1,9 +1,15 @@
 import re
-from io import BytesIO
+import os
+import uuid
+import asyncio
+from collections import OrderedDict, defaultdict
 from pathlib import Path
 import aiohttp
 import discord
 
+from bot.logger import setup_logger
+from bot.config import config
+
 def extract_google_drive_file_id(url):
     patterns = [
         r'/d/([a-zA-Z0-9-_]+)',  # https://drive.google.com/file/d/FILE_ID/view
@@ -30,22 +36,194 @@ def create_preview_image_from_url(url):
         return None
     return get_google_drive_preview_image_url(file_id)
 
+_IMAGE_SIGNATURES = (b'\xff\xd8\xff', b'\x89PNG\r\n\x1a\n', b'GIF87a', b'GIF89a')
+
+def is_image_data(data: bytes) -> bool:
+    """Recognize JPEG, PNG, GIF, WebP and HEIC/AVIF by their magic bytes."""
+    if data.startswith(_IMAGE_SIGNATURES):
+        return True
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return True
+    return data[4:8] == b'ftyp' and data[8:12] in (b'heic', b'heix', b'mif1', b'msf1', b'avif')
+
+class DriveAssetCache:
+    """
+    Disk cache for Google Drive assets, capped at `max_bytes` with LRU eviction.
+
+    Downloads are streamed to a temp file and renamed into place, so readers
+    never see partial files. Concurrent requests for the same file_id share
+    one download. Responses that are not images (e.g. Drive quota pages) are
+    rejected instead of cached.
+    """
+    def __init__(self, cache_dir="cache", max_bytes=1024 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.logger = setup_logger('DriveAssetCache')
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._inflight = {}
+
+        # metrics
+        self.hits = 0
+        self.misses = 0
+        self.shared_downloads = 0
+        self.failures = defaultdict(int)
+        self.evictions = 0
+
+        # Rebuild the index from disk, least recently used first
+        for stale in self.cache_dir.glob("*.tmp"):
+            stale.unlink(missing_ok=True)
+        files = sorted(self.cache_dir.glob("*.png"), key=lambda f: f.stat().st_mtime)
+        for file_path in files:
+            self._add(file_path.stem, file_path.stat().st_size)
+        self._evict()
+
+    def path_for(self, file_id):
+        return self.cache_dir / f"{file_id}.png"
+
+    def _add(self, file_id, size):
+        if file_id in self._entries:
+            self._total_bytes -= self._entries.pop(file_id)
+        self._entries[file_id] = size
+        self._total_bytes += size
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            file_id, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.path_for(file_id).unlink(missing_ok=True)
+            self.evictions += 1
+
+    async def get(self, file_id):
+        """Return the local path of `file_id`, downloading it once if needed; None on failure."""
+        file_path = self.path_for(file_id)
+        if file_id in self._entries and file_path.exists():
+            self._entries.move_to_end(file_id)
+            # mtime keeps the LRU order across restarts
+            os.utime(file_path)
+            self.hits += 1
+            return file_path
+
+        task = self._inflight.get(file_id)
+        if task is not None:
+            self.shared_downloads += 1
+            return await asyncio.shield(task)
+
+        self.misses += 1
+        task = asyncio.ensure_future(self._download(file_id))
+        self._inflight[file_id] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._inflight.pop(file_id, None)
+
+    async def _download(self, file_id):
+        file_path = self.path_for(file_id)
+        tmp_path = self.cache_dir / f"{file_id}.{uuid.uuid4().hex}.tmp"
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(get_google_drive_download_url(file_id)) as response:
+                    if response.status != 200:
+                        self.failures['status'] += 1
+                        self.logger.warning(f"Drive download {file_id} failed: HTTP {response.status}")
+                        return None
+                    # Drive often serves files as octet-stream; an HTML page means quota or permission errors
+                    if not response.content_type.startswith('image/') and response.content_type != 'application/octet-stream':
+                        self.failures['content_type'] += 1
+                        self.logger.warning(f"Drive download {file_id} returned {response.content_type}, not an image")
+                        return None
+                    size, head = 0, b''
+                    f = await asyncio.to_thread(open, tmp_path, 'wb')
+                    try:
+                        async for chunk in response.content.iter_chunked(64 * 1024):
+                            if len(head) < 12:
+                                head += chunk[:12 - len(head)]
+                            # Disk writes stay off the event loop
+                            await asyncio.to_thread(f.write, chunk)
+                            size += len(chunk)
+                            # The magic bytes are known after the first chunk; stop early on error pages
+                            if len(head) >= 12 and not is_image_data(head):
+                                break
+                    finally:
+                        await asyncio.to_thread(f.close)
+
+            if not is_image_data(head):
+                self.failures['content_type'] += 1
+                self.logger.warning(f"Drive download {file_id} is not an image ({response.content_type})")
+                return None
+
+            os.replace(tmp_path, file_path)
+            self._add(file_id, size)
+            self._evict()
+            return file_path
+        except Exception as e:
+            self.failures['error'] += 1
+            self.logger.warning(f"Drive download {file_id} failed: {e}")
+            return None
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink(missing_ok=True)
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.shared_downloads
+        return {
+            'entries': len(self._entries),
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'shared_downloads': self.shared_downloads,
+            'hit_ratio': round((self.hits + self.shared_downloads) / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+            'failures': dict(self.failures),
+        }
+
+_drive_asset_caches = {}
+
+def get_drive_asset_cache(cache_dir="cache"):
+    cache = _drive_asset_caches.get(cache_dir)
+    if cache is None:
+        cache = _drive_asset_caches[cache_dir] = DriveAssetCache(cache_dir, max_bytes=config.DRIVE_CACHE_MAX_BYTES)
+    return cache
+
 async def create_file_from_url(url, cache_dir="cache"):
     file_id = extract_google_drive_file_id(url)
     if not file_id:
         return None
-    
-    cache_path = Path(cache_dir)
-    cache_path.mkdir(exist_ok=True)
-    cached_file_path = cache_path / f"{file_id}.png"
-    if cached_file_path.exists():
-        return discord.File(cached_file_path, filename=cached_file_path.name)
-
-    async with aiohttp.ClientSession() as session:
-        async with session.get(get_google_drive_download_url(file_id)) as response:
-            if response.status == 200:
-                data = await response.read()
-                with open(cached_file_path, 'wb') as f:
-                    f.write(data)
-                return discord.File(BytesIO(data), filename=cached_file_path.name)
-    return None
+
+    cached_file_path = await get_drive_asset_cache(cache_dir).get(file_id)
+    if cached_file_path is None:
+        return None
+    return discord.File(cached_file_path, filename=cached_file_path.name)
+
+async def create_files_from_urls(urls, max_concurrency=None, cache_dir="cache"):
+    """
+    Fetch several assets concurrently, at most `max_concurrency` at a time.
+    `urls` is a list or a comma-separated string; files keep the order of `urls`, failures are skipped.
+    """
+    if isinstance(urls, str):
+        urls = urls.split(',')
+    urls = [url.strip() for url in urls or [] if url and url.strip()]
+    semaphore = asyncio.Semaphore(max_concurrency or config.DRIVE_MAX_CONCURRENCY)
+
+    async def fetch(url):
+        async with semaphore:
+            return await create_file_from_url(url, cache_dir)
+
+    files = await asyncio.gather(*(fetch(url) for url in urls))
+    return [file for file in files if file]
+
+async def prefetch_drive_assets(urls, max_concurrency=None, cache_dir="cache"):
+    """Download assets into the cache without building files; returns how many are ready on disk."""
+    file_ids = {extract_google_drive_file_id(url.strip()) for url in urls if url and url.strip()}
+    file_ids.discard(None)
+    cache = get_drive_asset_cache(cache_dir)
+    semaphore = asyncio.Semaphore(max_concurrency or config.DRIVE_MAX_CONCURRENCY)
+
+    async def fetch(file_id):
+        async with semaphore:
+            return await cache.get(file_id)
+
+    paths = await asyncio.gather(*(fetch(file_id) for file_id in file_ids))
+    return sum(1 for path in paths if path)
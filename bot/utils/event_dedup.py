@@ -0,0 +1,48 @@
+import time
+from collections import OrderedDict, defaultdict
+
+class EventDeduplicator:
+    """
+    Bounded, time-windowed seen-set for background events.
+
+    Generation backends occasionally post the same completion event twice.
+    Every event id is remembered for `window_seconds`; a second sighting
+    inside that window is reported as a duplicate and counted per event type.
+    The set never holds more than `max_size` ids (oldest ids are evicted first).
+    """
+    def __init__(self, window_seconds=15, max_size=10000):
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self._seen = OrderedDict()
+        self.accepted = defaultdict(int)
+        self.dropped = defaultdict(int)
+
+    def _expire(self, now):
+        while self._seen:
+            event_id, seen_at = next(iter(self._seen.items()))
+            if now - seen_at < self.window_seconds and len(self._seen) <= self.max_size:
+                break
+            self._seen.popitem(last=False)
+
+    def is_duplicate(self, event_id, event_type='default'):
+        """Return True if `event_id` was already seen inside the window, otherwise remember it."""
+        now = time.monotonic()
+        self._expire(now)
+
+        if event_id in self._seen:
+            self.dropped[event_type] += 1
+            return True
+
+        self._seen[event_id] = now
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        self.accepted[event_type] += 1
+        return False
+
+    def stats(self):
+        return {
+            'window_seconds': self.window_seconds,
+            'tracked_events': len(self._seen),
+            'accepted': dict(self.accepted),
+            'dropped': dict(self.dropped),
+        }
@@ -0,0 +1,110 @@
+import asyncio
+import time
+import traceback
+from collections import deque
+
+from bot.logger import setup_logger
+
+class EventRouter:
+    """
+    Route inbound events to per-user FIFO lanes.
+
+    Events for the same user (DMs, background commands, interaction follow-ups)
+    are processed strictly in arrival order, one at a time. Lanes of different
+    users run in parallel, bounded by `max_workers` concurrently running handlers.
+    A lane's worker task only lives while the lane has pending events.
+
+    Never `call()` into the lane of the user whose handler is currently running:
+    the handler would wait for itself.
+    """
+    def __init__(self, max_workers=16, wait_sample_size=1000):
+        self.max_workers = max_workers
+        self.logger = setup_logger('EventRouter')
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self._queues = {}
+        self._workers = {}
+        self._running = 0
+
+        # metrics
+        self.total_events = 0
+        self.failed_events = 0
+        self.max_queue_depth = 0
+        self._wait_times = deque(maxlen=wait_sample_size)
+        self.max_wait_time = 0.0
+
+    def dispatch(self, key, handler, *args, **kwargs):
+        """Enqueue `handler(*args, **kwargs)` on the lane of `key` without waiting for it."""
+        self._enqueue(key, handler, args, kwargs, future=None)
+
+    async def call(self, key, handler, *args, **kwargs):
+        """Enqueue `handler(*args, **kwargs)` on the lane of `key` and wait for its result."""
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(key, handler, args, kwargs, future=future)
+        return await future
+
+    def _enqueue(self, key, handler, args, kwargs, future):
+        key = str(key)
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = asyncio.Queue()
+
+        queue.put_nowait((time.monotonic(), handler, args, kwargs, future))
+        self.total_events += 1
+        self.max_queue_depth = max(self.max_queue_depth, queue.qsize())
+
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._drain(key, queue))
+
+    async def _drain(self, key, queue):
+        try:
+            while not queue.empty():
+                enqueued_at, handler, args, kwargs, future = queue.get_nowait()
+                async with self._semaphore:
+                    wait_time = time.monotonic() - enqueued_at
+                    self._wait_times.append(wait_time)
+                    self.max_wait_time = max(self.max_wait_time, wait_time)
+                    if wait_time > 5:
+                        self.logger.warning(f"Event for {key} waited {wait_time:.1f}s in queue ({handler.__name__})")
+
+                    self._running += 1
+                    try:
+                        result = await handler(*args, **kwargs)
+                        if future is not None and not future.done():
+                            future.set_result(result)
+                    except Exception as e:
+                        self.failed_events += 1
+                        self.logger.error(f"Event handler {handler.__name__} failed for {key}: {e}\n{traceback.format_exc()}")
+                        if future is not None and not future.done():
+                            future.set_exception(e)
+                    finally:
+                        self._running -= 1
+        finally:
+            # No await between the emptiness check and the cleanup, so no event can slip in
+            del self._workers[key]
+            if queue.empty():
+                del self._queues[key]
+
+    def queue_depths(self):
+        return {key: queue.qsize() for key, queue in self._queues.items() if queue.qsize() > 0}
+
+    def stats(self):
+        waits = sorted(self._wait_times)
+        def percentile(p):
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(len(waits) * p))], 3)
+
+        depths = self.queue_depths()
+        return {
+            'max_workers': self.max_workers,
+            'running': self._running,
+            'active_lanes': len(self._workers),
+            'queued_events': sum(depths.values()),
+            'deepest_lanes': dict(sorted(depths.items(), key=lambda x: -x[1])[:5]),
+            'max_queue_depth': self.max_queue_depth,
+            'total_events': self.total_events,
+            'failed_events': self.failed_events,
+            'wait_p50': percentile(0.5),
+            'wait_p95': percentile(0.95),
+            'wait_max': round(self.max_wait_time, 3),
+        }
@@ -0,0 +1,109 @@
+import copy
+import hashlib
+import json
+import os
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+
+from bot.logger import setup_logger
+
+class LLMResultCache:
+    """
+    Content-addressed cache for deterministic LLM calls (e.g. typo correction).
+
+    Entries are keyed by a sha256 of everything that shapes the response:
+    prompt text, additional context, conversation, user input and model.
+    The memory tier is an LRU bounded by `max_entries`; when `disk_dir` is set,
+    entries are also persisted as one JSON file per key and survive restarts.
+    Hits and misses are counted per namespace (mission type).
+    """
+    def __init__(self, max_entries=2048, disk_dir=None):
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self.logger = setup_logger('LLMResultCache')
+        self._entries = OrderedDict()
+        self.hits = defaultdict(int)
+        self.disk_hits = defaultdict(int)
+        self.misses = defaultdict(int)
+
+    @staticmethod
+    def make_key(prompt, additional_context, conversations, user_input, model):
+        payload = json.dumps(
+            [prompt, additional_context, conversations, str(user_input), model],
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key, namespace='default'):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits[namespace] += 1
+            return copy.deepcopy(self._entries[key])
+
+        value = self._load_from_disk(key)
+        if value is not None:
+            self._remember(key, value)
+            self.disk_hits[namespace] += 1
+            return copy.deepcopy(value)
+
+        self.misses[namespace] += 1
+        return None
+
+    def set(self, key, value):
+        value = copy.deepcopy(value)
+        self._remember(key, value)
+        self._save_to_disk(key, value)
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load_from_disk(self, key):
+        if not self.disk_dir:
+            return None
+        file_path = self.disk_dir / f"{key}.json"
+        if not file_path.exists():
+            return None
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Failed to read cache entry {key}: {e}")
+            return None
+
+    def _save_to_disk(self, key, value):
+        if not self.disk_dir:
+            return
+        file_path = self.disk_dir / f"{key}.json"
+        tmp_path = file_path.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, file_path)
+        except Exception as e:
+            self.logger.warning(f"Failed to write cache entry {key}: {e}")
+
+    def stats(self):
+        namespaces = set(self.hits) | set(self.disk_hits) | set(self.misses)
+        hit_rates = {}
+        for namespace in sorted(namespaces):
+            hits = self.hits[namespace] + self.disk_hits[namespace]
+            total = hits + self.misses[namespace]
+            hit_rates[namespace] = {
+                'hits': self.hits[namespace],
+                'disk_hits': self.disk_hits[namespace],
+                'misses': self.misses[namespace],
+                'hit_rate': round(hits / total, 3) if total else 0.0,
+            }
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'disk': str(self.disk_dir) if self.disk_dir else None,
+            'namespaces': hit_rates,
+        }
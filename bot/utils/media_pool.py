@@ -0,0 +1,225 @@
+import asyncio
+import io
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import aiohttp
+import discord
+
+from bot.logger import setup_logger
+from bot.config import config
+
+def heic_to_jpeg(data: bytes, max_side: int, quality: int = 85):
+    """
+    Decode HEIC/HEIF, apply EXIF orientation, downscale to `max_side` and encode as JPEG.
+    Runs inside the media worker pool; returns (jpeg_bytes, stage_timings).
+    """
+    import pillow_heif
+    from PIL import Image, ImageOps
+
+    timings = {}
+    start_time = time.monotonic()
+    pillow_heif.register_heif_opener()
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    timings['decode'] = time.monotonic() - start_time
+
+    start_time = time.monotonic()
+    image = ImageOps.exif_transpose(image).convert('RGB')
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+    timings['resize'] = time.monotonic() - start_time
+
+    start_time = time.monotonic()
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=quality, optimize=True)
+    timings['encode'] = time.monotonic() - start_time
+    return output.getvalue(), timings
+
+def page_preview(src_path: str, dst_path: str, max_side: int, quality: int = 82):
+    """
+    Write a web-sized JPEG of a print-resolution page next to the original.
+    Runs inside the media worker pool; returns (None, stage_timings).
+    """
+    import os
+    from PIL import Image
+
+    timings = {}
+    start_time = time.monotonic()
+    image = Image.open(src_path)
+    # Let the JPEG decoder skip detail we are about to throw away
+    image.draft('RGB', (max_side, max_side))
+    image = image.convert('RGB')
+    timings['decode'] = time.monotonic() - start_time
+
+    start_time = time.monotonic()
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+    timings['resize'] = time.monotonic() - start_time
+
+    start_time = time.monotonic()
+    tmp_path = f"{dst_path}.{os.getpid()}.tmp"
+    image.save(tmp_path, format='JPEG', quality=quality, optimize=True, progressive=True)
+    os.replace(tmp_path, dst_path)
+    timings['encode'] = time.monotonic() - start_time
+    return None, timings
+
+def compose_draft_page(photos, lines, size=1024, font_path=None):
+    """
+    Approximate a book page: photos in a grid, aside text lines in a band below.
+    Runs inside the media worker pool; returns (jpeg_bytes, stage_timings).
+    """
+    import math
+    import os
+    import pillow_heif
+    from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+    timings = {}
+    start_time = time.monotonic()
+    pillow_heif.register_heif_opener()
+    images = []
+    for data in photos:
+        image = Image.open(io.BytesIO(data))
+        image.draft('RGB', (size, size))
+        images.append(ImageOps.exif_transpose(image).convert('RGB'))
+    timings['decode'] = time.monotonic() - start_time
+
+    start_time = time.monotonic()
+    margin = size // 24
+    page = Image.new('RGB', (size, size), (252, 248, 243))
+
+    font = None
+    if lines and font_path and os.path.exists(font_path):
+        font = ImageFont.truetype(font_path, size // 28)
+    line_height = int(size / 28 * 1.5)
+    text_height = min(len(lines) * line_height + margin, size * 35 // 100) if font else 0
+
+    if images:
+        cols = 1 if len(images) == 1 else 2
+        rows = math.ceil(len(images) / cols)
+        cell_w = (size - margin * (cols + 1)) // cols
+        cell_h = (size - text_height - margin * (rows + 1)) // rows
+        for index, image in enumerate(images):
+            row, col = divmod(index, cols)
+            cell = ImageOps.fit(image, (cell_w, cell_h), Image.LANCZOS)
+            page.paste(cell, (margin + col * (cell_w + margin), margin + row * (cell_h + margin)))
+
+    if font:
+        draw = ImageDraw.Draw(page)
+        y = size - text_height
+        for line in lines:
+            if y + line_height > size - margin // 2:
+                break
+            draw.text((size // 2, y), line, font=font, fill=(80, 64, 64), anchor='ma')
+            y += line_height
+    timings['compose'] = time.monotonic() - start_time
+
+    start_time = time.monotonic()
+    output = io.BytesIO()
+    page.save(output, format='JPEG', quality=80)
+    timings['encode'] = time.monotonic() - start_time
+    return output.getvalue(), timings
+
+class MediaPool:
+    """
+    Process pool for CPU-bound image work, so conversions never run on the gateway loop.
+    Keeps per-stage timings and how often jobs had to wait for a free worker.
+    """
+    def __init__(self, max_workers=2, max_side=2480):
+        self.max_workers = max_workers
+        self.max_side = max_side
+        self.logger = setup_logger('MediaPool')
+        self._executor = None
+        self._in_flight = 0
+
+        # metrics
+        self.jobs = 0
+        self.failed_jobs = 0
+        self.saturated_jobs = 0
+        self.max_in_flight = 0
+        self.stage_totals = defaultdict(float)
+        self.stage_counts = defaultdict(int)
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _record(self, stage, seconds):
+        self.stage_totals[stage] += seconds
+        self.stage_counts[stage] += 1
+
+    async def run(self, func, *args):
+        """Run `func(*args)` in the pool; `func` returns (result, stage_timings)."""
+        self.jobs += 1
+        self._in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        if self._in_flight > self.max_workers:
+            self.saturated_jobs += 1
+
+        start_time = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            result, timings = await loop.run_in_executor(self.executor, func, *args)
+        except Exception:
+            self.failed_jobs += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+        total = time.monotonic() - start_time
+        for stage, seconds in timings.items():
+            self._record(stage, seconds)
+        # Time spent queued for a worker or pickling arguments
+        self._record('queue', max(0.0, total - sum(timings.values())))
+        return result
+
+    async def fetch(self, url) -> bytes:
+        start_time = time.monotonic()
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url) as response:
+                response.raise_for_status()
+                data = await response.read()
+        self._record('fetch', time.monotonic() - start_time)
+        return data
+
+    async def upload(self, client, data: bytes, filename: str):
+        """Post `data` to the file upload channel and return the resulting attachment."""
+        start_time = time.monotonic()
+        channel = client.get_channel(int(config.FILE_UPLOAD_CHANNEL_ID))
+        if channel is None or not isinstance(channel, discord.TextChannel):
+            raise Exception('Invalid channel')
+
+        message = await channel.send(file=discord.File(io.BytesIO(data), filename=filename))
+        self._record('upload', time.monotonic() - start_time)
+        return message.attachments[0]
+
+    async def convert_heic_attachment(self, client, heic_attachment):
+        """Convert an uploaded HEIC/HEIF attachment to JPEG and re-host it; returns the new attachment info."""
+        data = await self.fetch(heic_attachment['url'])
+        jpg_data = await self.run(heic_to_jpeg, data, self.max_side)
+
+        filename = heic_attachment['filename'].rsplit('.', 1)[0] + '.jpg'
+        attachment = await self.upload(client, jpg_data, filename)
+        return {
+            "photo_index": heic_attachment.get('photo_index'),
+            "id": attachment.id,
+            "filename": attachment.filename,
+            "url": attachment.url
+        }
+
+    def stats(self):
+        return {
+            'max_workers': self.max_workers,
+            'in_flight': self._in_flight,
+            'max_in_flight': self.max_in_flight,
+            'jobs': self.jobs,
+            'failed_jobs': self.failed_jobs,
+            'saturated_jobs': self.saturated_jobs,
+            'avg_stage_seconds': {
+                stage: round(self.stage_totals[stage] / count, 3)
+                for stage, count in self.stage_counts.items() if count
+            },
+        }
@@ -2,12 +2,21 @@ import time
 import re
 import json
 import os
-from openai import OpenAI
-from pathlib import Path
-from pydub import AudioSegment
+import asyncio
+import hashlib
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from openai import AsyncOpenAI
 from typing import Dict, Any
 from bot.logger import setup_logger
 from bot.config import config
+from bot.utils.rate_limiter import TokenBucket
+from bot.utils.prompt_cache import PromptCache
+from bot.utils.llm_cache import LLMResultCache
+from bot.utils.response_schemas import get_response_format, validate_response
+from bot.utils.audio_utils import prepare_audio_for_transcription, probe_duration
+from bot.utils.transcription import build_transcriber
+from bot.utils.text_layout import get_text_layout
 
 _CH = re.compile(r'[\u3400-\u4DBF\u4E00-\u9FFF\uF900-\uFAFF]')
 
@@ -26,109 +35,164 @@ def line_count(s: str) -> int:
 def normalize_aside_text(aside_text: str, cn_limit=15, en_limit=65) -> str:
     """
     Line breaks:
-     - If the input already contains `\n`, keep the user's original line breaks (do not modify).
-     - If the input contains no `\n`:
-         * For Chinese text: insert a line break after ~15 Chinese characters (using visual unit count).
-         * For English text: insert a line break at the nearest space before 60~65 characters.
+     - The user's own line breaks are kept; empty lines are dropped.
+     - Each line is wrapped with the book font's glyph widths (see TextLayout):
+         * For Chinese text: about 15 full-width characters per line.
+         * For English text: about 65 average Latin characters per line, breaking at spaces.
     """
-    def insert_break_chinese(s: str, n=15) -> str:
-        result = ""
-        count = 0.0
-        for ch in s:
-            char_units = unit_length(ch)
-            if count + char_units > n and count > 0:
-                result += "\n"
-                count = 0.0
-            result += ch
-            count += char_units
-        return result
-
-    def insert_break_english(s: str, n=65) -> str:
-        # split by words and rebuild with line limit
-        words = s.split(" ")
-        line = ""
-        lines = []
-        for word in words:
-            if len(line) + len(word) + 1 > n:
-                lines.append(line.strip())
-                line = word
-            else:
-                line += " " + word if line else word
-        if line:
-            lines.append(line.strip())
-        return "\n".join(lines)
-
     if aside_text is None:
         return None
     aside_text = aside_text.rstrip("\r")
+    if not aside_text:
+        return aside_text
 
-    # Decide language type: if mostly ASCII → English; else → Chinese
-    ascii_ratio = sum(ch.isascii() for ch in aside_text) / len(aside_text)
-    processed = []
-    for l in aside_text.split("\n"):
-        if l.strip() == "":
-            continue
-        elif ascii_ratio > 0.7:
-            processed.append(insert_break_english(l, n=en_limit))
-        else:
-            processed.append(insert_break_chinese(l, n=cn_limit))
-    processed = "\n".join(processed)
-    return processed
+    layout = get_text_layout()
+    return "\n".join(layout.layout(aside_text, aside_text_max_width(aside_text, cn_limit, en_limit)))
+
+def aside_text_max_width(aside_text: str, cn_limit=15, en_limit=65) -> float:
+    """Line width in em for `aside_text`: mostly ASCII → English limit; else → Chinese limit"""
+    ascii_ratio = sum(ch.isascii() for ch in aside_text) / max(1, len(aside_text))
+    if ascii_ratio > 0.7:
+        return en_limit * get_text_layout().latin_advance
+    return cn_limit
+
+def aside_text_fits(aside_text: str, max_lines: int, cn_limit=15, en_limit=65) -> bool:
+    """Whether `aside_text` prints in at most `max_lines` lines, without building the wrapped text"""
+    if not aside_text:
+        return True
+    return get_text_layout().fits(aside_text, aside_text_max_width(aside_text, cn_limit, en_limit), max_lines)
+
+# Sent instead of the raw reply when the model keeps answering in the wrong format
+INVALID_RESPONSE_MESSAGE = "抱歉，我剛剛沒有整理好你的回答，請再傳一次喔！"
 
 class OpenAIUtils:
     def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+        self.client = AsyncOpenAI(api_key=api_key)
         self.logger = setup_logger('OpenAIUtils')
 
-        # check if audio folder exists
-        if not os.path.exists('audio'):
-            os.makedirs('audio')
+        # Bound in-flight requests overall and the request rate per model
+        self._semaphore = asyncio.Semaphore(config.OPENAI_MAX_CONCURRENCY)
+        self._rate_limiters = {
+            model: TokenBucket.per_minute(rpm) for model, rpm in config.OPENAI_MODEL_RPM.items()
+        }
+        self.prompt_cache = PromptCache(config.PROMPT_DIR, auto_reload=config.PROMPT_AUTO_RELOAD)
+        self.result_cache = LLMResultCache(max_entries=config.LLM_CACHE_SIZE, disk_dir=config.LLM_CACHE_DIR)
+        self.transcription_cache = LLMResultCache(max_entries=config.TRANSCRIPTION_CACHE_SIZE)
+        self.transcriber = build_transcriber(
+            self,
+            config.TRANSCRIPTION_BACKEND,
+            local_model=config.LOCAL_WHISPER_MODEL,
+            timeout=config.TRANSCRIPTION_TIMEOUT
+        )
+
+        # Token usage per prompt file, to verify provider-side prompt caching
+        self.usage_stats = defaultdict(lambda: defaultdict(float))
+        # (time to first token, total latency) of recent assistant runs
+        self.assistant_latencies = deque(maxlen=500)
 
     async def convert_audio_to_message(self, message):
-        file_path = os.path.join('audio', f'{message.author.id}.ogg')
-        await message.attachments[0].save(file_path)
-        audio = AudioSegment.from_file(file_path)
-        file_path = file_path.rsplit('.', 1)[0] + '.mp3'
-        audio.export(file_path, format='mp3')
-
-        transcription = self.client.audio.transcriptions.create(
-            model="whisper-1",
-            file=Path(file_path),
-            prompt='請以台灣繁體中文',
-            language='zh',
-        )
-        if transcription.text:
-            return {"result": transcription.text}
+        # Keep the clip in memory: no shared files between concurrent messages
+        attachment = message.attachments[0]
+        data = await attachment.read()
+        if not data:
+            return {"error": "empty_audio", "message": "沒有收到聲音，請再錄一次喔！"}
+
+        # Same clip resent after a failure: reuse the transcription
+        cache_key = hashlib.sha256(data).hexdigest()
+        cached_result = self.transcription_cache.get(cache_key, namespace='voice_message')
+        if cached_result is not None:
+            return cached_result
+
+        # Reject clips by header duration before any decoding or upload
+        duration = getattr(attachment, 'duration', None) or probe_duration(data, attachment.filename)
+        if duration is not None:
+            if duration < config.AUDIO_MIN_SECONDS:
+                return {"error": "too_short", "message": "錄音太短了，請再說一次喔！"}
+            if duration > config.AUDIO_MAX_SECONDS:
+                return {"error": "too_long", "message": f"錄音太長了，請控制在 {config.AUDIO_MAX_SECONDS // 60} 分鐘以內喔！"}
+
+        data, filename = await prepare_audio_for_transcription(data, attachment.filename)
+
+        text = await self.transcriber.transcribe(data, filename, language='zh', prompt='請以台灣繁體中文')
+        if text:
+            result = {"result": text}
+            self.transcription_cache.set(cache_key, result)
+            return result
         else:
             self.logger.error(f"Failed to parse audo message from {message.author.id}")
             return None
 
-    def load_thread(self):
-        return self.client.beta.threads.create().id
-
-    def add_task_instruction(self, thread_id, instructions):
-        _ = self.client.beta.threads.messages.create(
+    @asynccontextmanager
+    async def limited(self, model):
+        """Wait for the model's rate limit and a free concurrency slot."""
+        limiter = self._rate_limiters.get(model)
+        if limiter:
+            await limiter.acquire()
+        async with self._semaphore:
+            yield
+
+    async def load_thread(self):
+        thread = await self.client.beta.threads.create()
+        return thread.id
+
+    async def add_task_instruction(self, thread_id, instructions):
+        _ = await self.client.beta.threads.messages.create(
             thread_id=thread_id,
             role="assistant",
             content=instructions,
         )
 
-    def get_reply_message(self, assistant_id, thread_id, user_message):
-        _ = self.client.beta.threads.messages.create(
+    async def get_reply_message(self, assistant_id, thread_id, user_message):
+        _ = await self.client.beta.threads.messages.create(
             thread_id=thread_id,
             role="user",
             content=user_message,
         )
 
-        run = self.client.beta.threads.runs.create_and_poll(
-            thread_id=thread_id,
-            assistant_id=assistant_id
-        )
-
-        messages = self.client.beta.threads.messages.list(thread_id=thread_id)
-        process_result = self.post_process(messages.data[0].content[0].text.value)
+        # Stream the run instead of polling; only this run's messages are read back
+        start_time = time.monotonic()
+        first_token_at = None
+        async with self.limited("assistants"):
+            async with self.client.beta.threads.runs.stream(
+                thread_id=thread_id,
+                assistant_id=assistant_id
+            ) as stream:
+                async for event in stream:
+                    if event.event == "thread.message.delta" and first_token_at is None:
+                        first_token_at = time.monotonic()
+                final_messages = await stream.get_final_messages()
+
+        total_latency = time.monotonic() - start_time
+        ttft = (first_token_at - start_time) if first_token_at else total_latency
+        self.assistant_latencies.append((ttft, total_latency))
+        self.logger.debug(f"Assistant run: ttft={ttft:.2f}s total={total_latency:.2f}s")
+
+        if final_messages:
+            reply = final_messages[-1].content[0].text.value
+        else:
+            messages = await self.client.beta.threads.messages.list(thread_id=thread_id, order="desc", limit=1)
+            reply = messages.data[0].content[0].text.value
+        process_result = self.post_process(reply)
         return process_result
 
+    def assistant_latency_summary(self):
+        if not self.assistant_latencies:
+            return {'runs': 0}
+
+        def percentile(values, p):
+            values = sorted(values)
+            return round(values[min(len(values) - 1, int(len(values) * p))], 3)
+
+        ttfts = [ttft for ttft, _ in self.assistant_latencies]
+        totals = [total for _, total in self.assistant_latencies]
+        return {
+            'runs': len(self.assistant_latencies),
+            'ttft_p50': percentile(ttfts, 0.5),
+            'ttft_p95': percentile(ttfts, 0.95),
+            'total_p50': percentile(totals, 0.5),
+            'total_p95': percentile(totals, 0.95),
+        }
+
     def post_process(self, response):
         response = self.clean_message(response)
         if '{' in response and '}' in response:
@@ -286,6 +350,21 @@ class OpenAIUtils:
         self.logger.debug(f"Final reuslts: {parsed}")
         return parsed
 
+    def parse_structured_response(self, response, schema=None):
+        """Parse a model reply and check it against `schema`; returns (result, errors)."""
+        try:
+            # Structured outputs are plain JSON; fall back to scanning for legacy prompts
+            parsed = json.loads(response)
+        except (TypeError, ValueError):
+            parsed = self.parsed_json(self.clean_message(response or ""))
+            if 'error' in parsed:
+                return parsed, [parsed['error']]
+
+        errors = validate_response(parsed, schema)
+        if errors:
+            return {'error': 'schema_error', 'message': f"{'; '.join(errors)}\n{response}"}, errors
+        return parsed, []
+
     def clean_message(self, message):
         message = re.sub(r'\【.*?\】', '', message).strip().replace('<br>', '\n')
         if '{{' in message and '}}' in message:
@@ -294,16 +373,59 @@ class OpenAIUtils:
         return message
 
     def load_prompt(self, file_path):
-        with open(file_path, "r") as file:
-            return file.read()
+        return self.prompt_cache.get(file_path)
+
+    def record_usage(self, prompt_path, response, latency):
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+
+        details = getattr(usage, "input_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", 0) or 0
+        stats = self.usage_stats[os.path.basename(prompt_path)]
+        stats['calls'] += 1
+        stats['input_tokens'] += usage.input_tokens or 0
+        stats['cached_tokens'] += cached_tokens
+        stats['output_tokens'] += usage.output_tokens or 0
+        stats['latency'] += latency
+        self.logger.debug(
+            f"{os.path.basename(prompt_path)}: input={usage.input_tokens} cached={cached_tokens} "
+            f"output={usage.output_tokens} latency={latency:.2f}s"
+        )
 
-    def process_user_message(self, prompt_path, user_input, conversations=None, additional_context=None) -> dict:
+    def usage_summary(self):
+        summary = {}
+        for prompt_file, stats in self.usage_stats.items():
+            calls = int(stats['calls'])
+            summary[prompt_file] = {
+                'calls': calls,
+                'input_tokens': int(stats['input_tokens']),
+                'cached_tokens': int(stats['cached_tokens']),
+                'cached_ratio': round(stats['cached_tokens'] / stats['input_tokens'], 3) if stats['input_tokens'] else 0.0,
+                'output_tokens': int(stats['output_tokens']),
+                'avg_latency': round(stats['latency'] / calls, 3) if calls else 0.0,
+                'invalid_responses': int(stats['invalid_responses']),
+            }
+        return summary
+
+    async def process_user_message(self, prompt_path, user_input, conversations=None, additional_context=None, cache_namespace=None) -> dict:
+        """
+        Run `user_input` through the prompt at `prompt_path`.
+        Pass `cache_namespace` (e.g. the mission type) to reuse results of identical requests.
+        """
+        model = "gpt-4o-mini"
         try:
             prompt = self.load_prompt(prompt_path)
-            if additional_context:
-                prompt = f"{additional_context}\n\n{prompt}"
 
-            # system prompt
+            cache_key = None
+            if cache_namespace:
+                cache_key = self.result_cache.make_key(prompt, additional_context, conversations, user_input, model)
+                cached_result = self.result_cache.get(cache_key, namespace=cache_namespace)
+                if cached_result is not None:
+                    self.logger.debug(f"LLM cache hit ({cache_namespace}) for {os.path.basename(prompt_path)}")
+                    return cached_result
+
+            # static system prompt first, so requests sharing a prompt share a cacheable prefix
             messages = [
                 {
                     "role": "developer",
@@ -311,6 +433,13 @@ class OpenAIUtils:
                 }
             ]
 
+            # per-call context (question, baby profile, ...) after the static part
+            if additional_context:
+                messages.append({
+                    "role": "developer",
+                    "content": str(additional_context)
+                })
+
             # history conversation
             for turn in conversations or []:
                 role = turn.get("role")
@@ -334,16 +463,45 @@ class OpenAIUtils:
                 "content": str(user_input)
             })
 
-            response = self.client.responses.create(
-                model="gpt-4o-mini",
-                input=messages,
-                text={
-                    "format": {
-                        "type": "json_object",
+            response_format = get_response_format(os.path.basename(prompt_path))
+            schema = response_format.get("schema")
+            for attempt in range(2):
+                async with self.limited(model):
+                    start_time = time.monotonic()
+                    response = await self.client.responses.create(
+                        model=model,
+                        input=messages,
+                        text={
+                            "format": response_format
+                        }
+                    )
+                    self.record_usage(prompt_path, response, time.monotonic() - start_time)
+                response_json, errors = self.parse_structured_response(response.output_text, schema)
+                if not errors:
+                    break
+
+                # One repair attempt: show the model its reply and what was wrong with it
+                self.logger.warning(f"Invalid response for {os.path.basename(prompt_path)} (attempt {attempt + 1}): {errors}")
+                self.usage_stats[os.path.basename(prompt_path)]['invalid_responses'] += 1
+                messages.extend([
+                    {
+                        "role": "assistant",
+                        "content": response.output_text or ""
+                    },
+                    {
+                        "role": "developer",
+                        "content": f"Your previous reply was invalid: {'; '.join(errors[:5])}. Reply again with only the JSON object in the required format."
                     }
-                }
-            )
-            response_json = self.parsed_json(response.output_text)
+                ])
+
+            if errors:
+                # The raw reply and validation errors are for the logs, not the user
+                self.logger.error(f"Giving up on {os.path.basename(prompt_path)} after repair: {response_json.get('message')}")
+                response_json = {'error': response_json.get('error', 'schema_error'), 'message': INVALID_RESPONSE_MESSAGE}
+
+            # Never cache failed parses, so a retry gets a fresh answer
+            if cache_key and 'error' not in response_json:
+                self.result_cache.set(cache_key, response_json)
             return response_json
         except Exception as e:
             self.logger.error(f"Error processing user message: {e}")
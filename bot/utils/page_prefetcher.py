@@ -0,0 +1,62 @@
+import asyncio
+import io
+import os
+from collections import OrderedDict
+
+import discord
+
+def _read_page(path):
+    mtime = os.stat(path).st_mtime_ns
+    with open(path, 'rb') as f:
+        return mtime, f.read()
+
+class PagePrefetcher:
+    """
+    Read-ahead for page-flipping views: neighbouring pages are loaded into memory
+    while the current one is shown, so ◀/▶ never waits on the disk.
+    Holds at most `max_pages` pages; an entry is dropped once the file changes.
+    """
+    def __init__(self, max_pages=3):
+        self.max_pages = max_pages
+        self._pages = OrderedDict()
+        self._inflight = {}
+
+        # metrics
+        self.hits = 0
+        self.misses = 0
+
+    def prefetch(self, paths):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        for path in paths:
+            if path in self._pages or path in self._inflight or not os.path.exists(path):
+                continue
+            task = self._inflight[path] = asyncio.create_task(self._load(path))
+            task.add_done_callback(lambda _, path=path: self._inflight.pop(path, None))
+
+    async def _load(self, path):
+        try:
+            self._pages[path] = await asyncio.to_thread(_read_page, path)
+        except OSError:
+            return
+        self._pages.move_to_end(path)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+    def file(self, path, filename):
+        """A discord.File for `path`, served from memory when the prefetched copy is current."""
+        entry = self._pages.get(path)
+        try:
+            if entry is not None and entry[0] == os.stat(path).st_mtime_ns:
+                self.hits += 1
+                self._pages.move_to_end(path)
+                return discord.File(io.BytesIO(entry[1]), filename=filename)
+        except FileNotFoundError:
+            pass
+
+        self.misses += 1
+        self._pages.pop(path, None)
+        return discord.File(path, filename=filename)
@@ -0,0 +1,80 @@
+import asyncio
+import os
+from collections import defaultdict
+
+from bot.logger import setup_logger
+from bot.utils.media_pool import page_preview
+
+CANVA_EXPORT_DIR = "/home/ubuntu/canva_exports"
+
+def page_export_path(baby_id, mission_id):
+    return f"{CANVA_EXPORT_DIR}/{baby_id}/{mission_id}.jpg"
+
+def preview_path_for(file_path):
+    return os.path.splitext(file_path)[0] + '.preview.jpg'
+
+class PagePreviews:
+    """
+    Web-sized derivatives of the exported book pages, stored next to the original as `<page>.preview.jpg`.
+    Views send the derivative when it is up to date and the original otherwise, building it in the background.
+    """
+    def __init__(self, media_pool, max_side=1280, quality=82):
+        self.media_pool = media_pool
+        self.max_side = max_side
+        self.quality = quality
+        self.logger = setup_logger('PagePreviews')
+        self._inflight = {}
+
+        # metrics
+        self.counts = defaultdict(int)
+
+    def _fresh_preview(self, file_path):
+        preview_path = preview_path_for(file_path)
+        try:
+            if os.stat(preview_path).st_mtime >= os.stat(file_path).st_mtime:
+                return preview_path
+        except FileNotFoundError:
+            pass
+        return None
+
+    def resolve(self, file_path):
+        """Path to send for `file_path`: the derivative if it is fresh, else the original (and build it lazily)."""
+        preview_path = self._fresh_preview(file_path)
+        if preview_path:
+            self.counts['preview'] += 1
+            return preview_path
+
+        self.counts['original'] += 1
+        if os.path.exists(file_path):
+            try:
+                asyncio.get_running_loop()
+                self._schedule(file_path)
+            except RuntimeError:
+                pass
+        return file_path
+
+    def _schedule(self, file_path):
+        task = self._inflight.get(file_path)
+        if task is None:
+            task = self._inflight[file_path] = asyncio.create_task(self._build(file_path))
+            task.add_done_callback(lambda _: self._inflight.pop(file_path, None))
+        return task
+
+    async def ensure(self, file_path):
+        """Build the derivative now (e.g. right after generation); returns the path to send."""
+        if not os.path.exists(file_path):
+            return file_path
+        if self._fresh_preview(file_path) is None:
+            await asyncio.shield(self._schedule(file_path))
+        return self._fresh_preview(file_path) or file_path
+
+    async def _build(self, file_path):
+        try:
+            await self.media_pool.run(page_preview, file_path, preview_path_for(file_path), self.max_side, self.quality)
+            self.counts['built'] += 1
+        except Exception as e:
+            self.counts['failed'] += 1
+            self.logger.warning(f"Failed to build preview of {file_path}: {e}")
+
+    def stats(self):
+        return {**self.counts, 'building': len(self._inflight)}
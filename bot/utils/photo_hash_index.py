@@ -0,0 +1,123 @@
+import json
+import os
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+
+from bot.logger import setup_logger
+
+class PhotoHashIndex:
+    """
+    Perceptual hashes of the photos placed in each (user, book), to spot the same photo used twice.
+    Each book is saved to its own JSON file in `data_dir` and loaded on first use,
+    so growth books filled over weeks keep their hashes across restarts.
+
+    The 64-bit dHash is split into `bands` bands. Two hashes within
+    `max_distance` bits (max_distance < bands) always share at least one
+    band exactly, so a lookup only compares against photos in the same
+    buckets instead of the whole book.
+    """
+    def __init__(self, data_dir=None, max_distance=6, bands=8, max_books=5000):
+        assert max_distance < bands
+        self.data_dir = Path(data_dir) if data_dir else None
+        if self.data_dir:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.logger = setup_logger('PhotoHashIndex')
+        self.max_distance = max_distance
+        self.bands = bands
+        self.band_bits = 64 // bands
+        self.max_books = max_books
+        self._books = OrderedDict()
+
+        # metrics
+        self.lookups = 0
+        self.duplicates = 0
+
+    def _band_keys(self, dhash):
+        mask = (1 << self.band_bits) - 1
+        return [(band, (dhash >> (band * self.band_bits)) & mask) for band in range(self.bands)]
+
+    def _path(self, user_id, book_id):
+        return self.data_dir / f"{user_id}_{book_id}.json"
+
+    def _load(self, user_id, book_id):
+        book = {'slots': {}, 'buckets': defaultdict(set)}
+        path = self._path(user_id, book_id) if self.data_dir else None
+        if path is None or not path.exists():
+            return book
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Failed to load photo hashes of user {user_id}, book {book_id}: {e}")
+            return book
+        for mission_id, position, dhash in records:
+            self._store(book, (mission_id, position), int(dhash, 16))
+        return book
+
+    def _save(self, user_id, book_id, book):
+        if not self.data_dir:
+            return
+        path = self._path(user_id, book_id)
+        records = [[mission_id, position, f"{dhash:016x}"] for (mission_id, position), dhash in book['slots'].items()]
+        try:
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(records, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning(f"Failed to save photo hashes of user {user_id}, book {book_id}: {e}")
+
+    def _book(self, user_id, book_id):
+        key = (str(user_id), book_id)
+        book = self._books.get(key)
+        if book is None:
+            book = self._books[key] = self._load(str(user_id), book_id)
+            if len(self._books) > self.max_books:
+                self._books.popitem(last=False)
+        self._books.move_to_end(key)
+        return book
+
+    def _store(self, book, slot, dhash):
+        book['slots'][slot] = dhash
+        for band_key in self._band_keys(dhash):
+            book['buckets'][band_key].add(slot)
+
+    def _discard(self, book, slot):
+        dhash = book['slots'].pop(slot, None)
+        if dhash is not None:
+            for band_key in self._band_keys(dhash):
+                book['buckets'][band_key].discard(slot)
+        return dhash
+
+    def remove(self, user_id, book_id, slot):
+        book = self._book(user_id, book_id)
+        if self._discard(book, slot) is not None:
+            self._save(str(user_id), book_id, book)
+
+    def add(self, user_id, book_id, slot, dhash):
+        """Store the photo of `slot` (replacing its previous one); returns the other slots holding a near-identical photo."""
+        book = self._book(user_id, book_id)
+        self._discard(book, slot)
+
+        candidates = set()
+        for band_key in self._band_keys(dhash):
+            candidates |= book['buckets'][band_key]
+        duplicates = [
+            other for other in candidates
+            if bin(book['slots'][other] ^ dhash).count('1') <= self.max_distance
+        ]
+
+        self._store(book, slot, dhash)
+        self._save(str(user_id), book_id, book)
+
+        self.lookups += 1
+        if duplicates:
+            self.duplicates += 1
+        return duplicates
+
+    def stats(self):
+        return {
+            'books': len(self._books),
+            'lookups': self.lookups,
+            'duplicates': self.duplicates,
+        }
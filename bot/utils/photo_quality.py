@@ -0,0 +1,181 @@
+import asyncio
+import io
+import time
+
+from bot.config import config
+
+# Detached checks are referenced here so they are not garbage-collected mid-run
+_background_checks = set()
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.heic', '.heif')
+
+# Thresholds, measured on the photo downscaled to ANALYSIS_SIDE
+ANALYSIS_SIDE = 1024
+BLUR_VARIANCE = 40          # variance of the Laplacian below this looks out of focus
+DARK_MEAN, BRIGHT_MEAN = 45, 220
+CLIPPED_RATIO = 0.5         # share of pixels crushed to black / blown to white
+MAX_ASPECT_RATIO = 2.5      # panoramas and long screenshots
+
+QUALITY_WARNINGS = {
+    'low_resolution': "解析度偏低，印刷後可能會模糊",
+    'blurry': "照片有些模糊",
+    'too_dark': "照片偏暗",
+    'too_bright': "照片過亮",
+    'extreme_aspect_ratio': "照片比例過長，裁切後可能看不到主角",
+}
+
+def assess_photo(data: bytes, min_side: int):
+    """
+    Check resolution, focus, exposure and aspect ratio of one photo, and compute its dHash.
+    Runs inside the media worker pool; returns ({'issues', 'dhash'}, stage_timings).
+    """
+    import pillow_heif
+    from PIL import Image, ImageFilter, ImageStat
+
+    timings = {}
+    start_time = time.monotonic()
+    pillow_heif.register_heif_opener()
+    image = Image.open(io.BytesIO(data))
+    width, height = image.size
+    # JPEGs can be decoded straight at a fraction of their size
+    image.draft('L', (ANALYSIS_SIDE, ANALYSIS_SIDE))
+    gray = image.convert('L')
+    gray.thumbnail((ANALYSIS_SIDE, ANALYSIS_SIDE))
+    timings['decode'] = time.monotonic() - start_time
+
+    start_time = time.monotonic()
+    issues = []
+    if min(width, height) < min_side:
+        issues.append('low_resolution')
+    if max(width, height) / max(1, min(width, height)) > MAX_ASPECT_RATIO:
+        issues.append('extreme_aspect_ratio')
+
+    laplacian = gray.filter(ImageFilter.Kernel((3, 3), (0, 1, 0, 1, -4, 1, 0, 1, 0), scale=1, offset=128))
+    if ImageStat.Stat(laplacian).var[0] < BLUR_VARIANCE:
+        issues.append('blurry')
+
+    histogram = gray.histogram()
+    pixels = sum(histogram) or 1
+    mean = ImageStat.Stat(gray).mean[0]
+    if mean < DARK_MEAN or sum(histogram[:16]) / pixels > CLIPPED_RATIO:
+        issues.append('too_dark')
+    elif mean > BRIGHT_MEAN or sum(histogram[240:]) / pixels > CLIPPED_RATIO:
+        issues.append('too_bright')
+
+    # dHash: brightness gradient of a 9x8 thumbnail, robust to resizing and re-encoding
+    thumb = list(gray.resize((9, 8), Image.LANCZOS).getdata())
+    dhash = 0
+    for row in range(8):
+        for col in range(8):
+            dhash = (dhash << 1) | (thumb[row * 9 + col] > thumb[row * 9 + col + 1])
+    timings['analyze'] = time.monotonic() - start_time
+    return {'issues': issues, 'dhash': dhash}, timings
+
+async def check_photo_quality(client, attachments):
+    """
+    Assess the uploaded images off the event loop.
+    Returns one report per image: {'attachment_id', 'url', 'filename', 'issues', 'dhash'}.
+    Never raises: a failed check must not block the upload.
+    """
+    images = [att for att in attachments if att.filename.lower().endswith(IMAGE_EXTENSIONS)]
+
+    async def assess(attachment):
+        try:
+            data = await client.media_pool.fetch(attachment.url)
+            result = await client.media_pool.run(assess_photo, data, config.PHOTO_MIN_SIDE)
+        except Exception as e:
+            client.logger.warning(f"Photo quality check failed for {attachment.filename}: {e}")
+            result = {'issues': [], 'dhash': None}
+        return {
+            'attachment_id': str(attachment.id),
+            'url': attachment.url.split('?')[0],
+            'filename': attachment.filename,
+            **result,
+        }
+
+    return await asyncio.gather(*(assess(att) for att in images))
+
+def format_quality_warning(reports):
+    lines = []
+    for index, report in enumerate(reports, start=1):
+        if not report['issues']:
+            continue
+        label = "這張照片" if len(reports) == 1 else f"第 {index} 張照片"
+        lines.append(f"⚠️ {label}：{'、'.join(QUALITY_WARNINGS[issue] for issue in report['issues'])}")
+
+    if not lines:
+        return None
+    return "\n".join(lines) + "\n印出來的效果可能不理想，建議換一張更清晰的照片喔！"
+
+def _same_photo(stored, report):
+    """Whether a stored mission attachment is the uploaded one, also after a HEIC → JPG conversion re-hosted it."""
+    if not stored:
+        return False
+    if stored.get('id') == report['attachment_id'] or (stored.get('url') or '').split('?')[0] == report['url']:
+        return True
+    # Converted photos get a new id and URL but keep the file name stem
+    filename = report['filename'].lower()
+    return (
+        filename.endswith(('.heic', '.heif'))
+        and (stored.get('filename') or '').lower() == filename.rsplit('.', 1)[0] + '.jpg'
+    )
+
+def _photo_slot(mission_id, mission_result, report):
+    """Where the uploaded attachment ended up in the mission: (mission_id, photo position or 'cover')."""
+    if _same_photo(mission_result.get('cover'), report):
+        return (mission_id, 'cover')
+    for position, attachment in enumerate(mission_result.get('attachments') or []):
+        if _same_photo(attachment, report):
+            return (mission_id, position)
+    return None
+
+def find_duplicate_photos(client, user_id, book_id, mission_id, mission_result, reports):
+    """
+    Record the uploaded photos in the book's hash index and return a warning
+    when one of them looks like a photo already placed on another page.
+    """
+    if book_id is None:
+        # Without a book, photos of unrelated books would be compared with each other
+        return None
+
+    lines = []
+    for index, report in enumerate(reports, start=1):
+        slot = _photo_slot(mission_id, mission_result, report)
+        if slot is None or report['dhash'] is None:
+            continue
+
+        duplicates = client.photo_hash_index.add(user_id, book_id, slot, report['dhash'])
+        if duplicates:
+            label = "這張照片" if len(reports) == 1 else f"第 {index} 張照片"
+            where = "這次任務的另一張照片" if any(d[0] == mission_id for d in duplicates) else "繪本其他頁的照片"
+            lines.append(f"⚠️ {label}和{where}幾乎一樣")
+
+    if not lines:
+        return None
+    return "\n".join(lines) + "\n同一張照片重複出現在繪本裡，建議換一張不同的照片喔！"
+
+def start_photo_checks(client, channel, user_id, book_id, mission_id, attachments, mission_result):
+    """
+    Run the quality and duplicate checks in the background, so the mission flow never waits
+    for the download and decode; warnings are sent to `channel` when they are ready.
+    """
+    if not attachments:
+        return
+    # Snapshot where the photos landed; the record may change before the check finishes
+    placed = {'cover': mission_result.get('cover'), 'attachments': list(mission_result.get('attachments') or [])}
+
+    async def run():
+        try:
+            photo_reports = await check_photo_quality(client, attachments)
+            warnings = [
+                format_quality_warning(photo_reports),
+                find_duplicate_photos(client, user_id, book_id, mission_id, placed, photo_reports),
+            ]
+            for warning in filter(None, warnings):
+                await channel.send(warning)
+        except Exception as e:
+            client.logger.warning(f"Photo checks failed for user {user_id}, mission {mission_id}: {e}")
+
+    task = asyncio.create_task(run())
+    _background_checks.add(task)
+    task.add_done_callback(_background_checks.discard)
@@ -0,0 +1,174 @@
+import re
+from datetime import date
+from typing import Dict, Optional
+
+# 西元 / 民國 dates: 2024-05-01, 2024/5/1, 2024.05.01, 113-05-01, 2024年5月1日, 20240501
+_DATE_PATTERNS = [
+    re.compile(r'(?<!\d)(\d{2,4})\s*[-/.年]\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})\s*[日號号]?(?!\d)'),
+    re.compile(r'(?<!\d)(\d{4})(\d{2})(\d{2})(?!\d)'),
+]
+
+_GENDER_WORDS = {
+    '男': '男孩', '男孩': '男孩', '男生': '男孩', '男寶': '男孩', '男寶寶': '男孩', 'boy': '男孩', 'male': '男孩',
+    '女': '女孩', '女孩': '女孩', '女生': '女孩', '女寶': '女孩', '女寶寶': '女孩', 'girl': '女孩', 'female': '女孩',
+}
+_GENDER_PATTERN = re.compile(
+    r'(?<![一-鿿a-z])(?:性別\s*[:：]?\s*)?(' + '|'.join(sorted(map(re.escape, _GENDER_WORDS), key=len, reverse=True)) + r')(?![一-鿿a-z])',
+    re.IGNORECASE,
+)
+
+_NUMBER = r'(\d+(?:\.\d+)?)'
+_HEIGHT_LABEL = r'(?:身高|身長|height)'
+_WEIGHT_LABEL = r'(?:體重|体重|weight)'
+_HEAD_LABEL = r'(?:頭圍|头围|head(?:\s*circumference)?)'
+_CM_UNIT = r'(?:cm|公分|釐米|厘米)'
+_WEIGHT_UNIT = r'(kg|公斤|g|公克|克)'
+
+_MEASUREMENT_PATTERNS = [
+    ('height', re.compile(_HEIGHT_LABEL + r'\s*[:：]?\s*' + _NUMBER + r'\s*' + _CM_UNIT + '?', re.IGNORECASE)),
+    ('head_circumference', re.compile(_HEAD_LABEL + r'\s*[:：]?\s*' + _NUMBER + r'\s*' + _CM_UNIT + '?', re.IGNORECASE)),
+    ('weight', re.compile(_WEIGHT_LABEL + r'\s*[:：]?\s*' + _NUMBER + r'\s*' + _WEIGHT_UNIT + '?', re.IGNORECASE)),
+    # Unlabelled values need a unit; cm values are told apart by range below
+    ('cm', re.compile(_NUMBER + r'\s*' + _CM_UNIT + r'(?![a-z])', re.IGNORECASE)),
+    ('weight', re.compile(_NUMBER + r'\s*' + _WEIGHT_UNIT + r'(?![a-z])', re.IGNORECASE)),
+]
+
+# Words that look like names but are answers the LLM should interpret
+_NOT_NAMES = {
+    '跳過', '略過', '不知道', '不清楚', '沒有', '忘了', '忘記', '好', '好的', '好喔', '是', '否', '不是', '對',
+    '你好', '您好', '謝謝', '感謝', '收到', '了解', '嗨', '哈囉',
+    'ok', 'yes', 'no', 'skip', 'hi', 'hello', 'hey', 'thanks', 'thank you',
+}
+# group(1) is the label, group(2) the name
+_CJK_NAME = re.compile(r'^((?:寶寶(?:的)?)?(?:名字|姓名|小名)\s*[:：]?\s*)?([一-鿿]{1,4})$')
+_EN_NAME = re.compile(r'^((?:english\s+)?name\s*[:：]?\s*)?([A-Za-z][A-Za-z\'\-]*(?:\s[A-Za-z][A-Za-z\'\-]*){0,2})$', re.IGNORECASE)
+
+_SEPARATORS = re.compile(r'[\s,，、;；。.!！~～]+')
+
+
+def _parse_date(year: int, month: int, day: int) -> Optional[str]:
+    if year < 1000:
+        # 民國年
+        year += 1911
+    try:
+        birthday = date(year, month, day)
+    except ValueError:
+        return None
+    if birthday > date.today() or birthday.year < 1990:
+        return None
+    return birthday.isoformat()
+
+
+def _number(value: str):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def _measurement(field: str, value: str, unit: str = None):
+    value = float(value)
+    if field == 'weight':
+        if unit and unit.lower() in ('kg', '公斤') or (not unit and value < 10):
+            value *= 1000
+        return ('weight', _number(str(value))) if 300 <= value <= 7000 else None
+    if field == 'cm':
+        # Birth height is ~40-60 cm, head circumference ~28-40 cm
+        if 40 < value <= 65:
+            field = 'height'
+        elif 25 <= value <= 40:
+            field = 'head_circumference'
+        else:
+            return None
+    if field == 'height' and not 30 <= value <= 65:
+        return None
+    if field == 'head_circumference' and not 25 <= value <= 45:
+        return None
+    return field, _number(str(value))
+
+
+def parse_baby_profile(text: str, expect_name: bool = False) -> Optional[Dict]:
+    """
+    Rule-based extraction of baby profile fields from a registration message.
+
+    Recognizes birthday (西元 / 民國), gender, height, weight, head circumference
+    and, on their own line, Chinese / English names. A name is only taken when it
+    is labelled (名字: / name:) or sent together with other fields; a bare short
+    reply such as "收到" goes to the LLM. Returns the extracted fields
+    only when every part of the message was understood; otherwise returns None
+    so the caller can fall back to the LLM.
+
+    Args:
+        text: The user's message
+        expect_name: The name is still missing, so a name line may be accepted as the name
+    """
+    if not text or not text.strip() or len(text) > 200:
+        return None
+
+    fields = {}
+    leftover_lines = []
+    for line in text.strip().splitlines():
+        line = line.strip()
+        if not line:
+            continue
+
+        remaining = line
+        for pattern in _DATE_PATTERNS:
+            for match in pattern.finditer(remaining):
+                birthday = _parse_date(*map(int, match.groups()))
+                if birthday is None or fields.get('birthday', birthday) != birthday:
+                    return None
+                fields['birthday'] = birthday
+            remaining = pattern.sub(' ', remaining)
+
+        for field, pattern in _MEASUREMENT_PATTERNS:
+            for match in pattern.finditer(remaining):
+                groups = match.groups()
+                parsed = _measurement(field, groups[0], groups[1] if len(groups) > 1 else None)
+                if parsed is None or parsed[0] in fields:
+                    return None
+                fields[parsed[0]] = parsed[1]
+            remaining = pattern.sub(' ', remaining)
+
+        for match in _GENDER_PATTERN.finditer(remaining):
+            gender = _GENDER_WORDS[match.group(1).lower()]
+            if fields.get('gender', gender) != gender:
+                return None
+            fields['gender'] = gender
+        remaining = _GENDER_PATTERN.sub(' ', remaining)
+
+        remaining = _SEPARATORS.sub(' ', remaining).strip()
+        if remaining:
+            # Names must be on their own line; leftovers next to other fields are free text
+            if remaining != _SEPARATORS.sub(' ', line).strip():
+                return None
+            leftover_lines.append(remaining)
+
+    if leftover_lines and not expect_name:
+        return None
+    has_other_fields = bool(fields)
+    for line in leftover_lines:
+        cjk_match = _CJK_NAME.match(line)
+        en_match = _EN_NAME.match(line)
+        match = cjk_match or en_match
+        if match is None or match.group(2).lower() in _NOT_NAMES:
+            return None
+        if not match.group(1) and not has_other_fields:
+            return None
+        if cjk_match and 'baby_name' not in fields:
+            fields['baby_name'] = cjk_match.group(2)
+        elif en_match and 'baby_name_en' not in fields:
+            fields['baby_name_en'] = en_match.group(2)
+        else:
+            return None
+
+    return fields or None
+
+
+# Gender codes stored by the API ('m' / 'f'), shown in the registration form the way users type them
+_GENDER_CODES = {'m': '男', 'f': '女'}
+
+def gender_form_value(gender: Optional[str]) -> Optional[str]:
+    """Map a stored gender to a value parse_baby_profile accepts; unknown values are left out."""
+    if not gender:
+        return None
+    gender = _GENDER_CODES.get(gender.lower(), gender)
+    return gender if gender.lower() in _GENDER_WORDS else None
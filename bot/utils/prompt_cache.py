@@ -0,0 +1,42 @@
+import os
+from pathlib import Path
+
+from bot.logger import setup_logger
+
+class PromptCache:
+    """
+    In-memory cache of the prompt templates under `prompt_dir`.
+
+    All templates are read once at startup. `reload()` re-reads them on demand
+    (e.g. from the RELOAD_PROMPTS background command); with `auto_reload`
+    enabled, a template is also refreshed whenever its file mtime changes.
+    """
+    def __init__(self, prompt_dir="bot/resource/prompts", auto_reload=False):
+        self.prompt_dir = Path(prompt_dir)
+        self.auto_reload = auto_reload
+        self.logger = setup_logger('PromptCache')
+        self._prompts = {}
+        self.reload()
+
+    def reload(self) -> int:
+        prompts = {}
+        for file_path in sorted(self.prompt_dir.glob("*.txt")):
+            prompts[os.path.normpath(file_path)] = self._read(file_path)
+        self._prompts = prompts
+        self.logger.info(f"Loaded {len(prompts)} prompt templates from {self.prompt_dir}")
+        return len(prompts)
+
+    def get(self, file_path) -> str:
+        key = os.path.normpath(file_path)
+        cached = self._prompts.get(key)
+        if cached is None:
+            # Not preloaded (e.g. a prompt outside prompt_dir)
+            cached = self._prompts[key] = self._read(key)
+        elif self.auto_reload and os.stat(key).st_mtime != cached[0]:
+            self.logger.info(f"Prompt changed on disk, reloading {key}")
+            cached = self._prompts[key] = self._read(key)
+        return cached[1]
+
+    def _read(self, file_path):
+        with open(file_path, "r") as file:
+            return os.stat(file_path).st_mtime, file.read()
@@ -0,0 +1,35 @@
+import asyncio
+import time
+
+class TokenBucket:
+    """
+    Async token-bucket limiter.
+
+    Refills `rate` tokens per second up to `capacity`; `acquire()` waits until
+    a token is available, so bursts up to `capacity` pass immediately and the
+    sustained rate never exceeds `rate`.
+    """
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, tokens: float = 1):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: int, burst: int = None):
+        return cls(rate=requests_per_minute / 60.0, capacity=burst or max(1, requests_per_minute // 10))
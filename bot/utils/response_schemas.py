@@ -0,0 +1,125 @@
+from typing import Any, Dict, List, Optional
+
+# JSON schemas for strict structured outputs, keyed by prompt file name.
+# Strict mode needs every property listed in `required` and no extra keys,
+# so optional values are expressed as nullable types.
+
+_NULLABLE_STRING = {"type": ["string", "null"]}
+_NULLABLE_NUMBER = {"type": ["number", "null"]}
+
+_ATTACHMENT = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "string"},
+        "url": {"type": "string"},
+        "filename": {"type": "string"},
+    },
+    "required": ["id", "url", "filename"],
+    "additionalProperties": False,
+}
+
+
+def _object(properties: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+ASIDE_TEXT_SCHEMA = _object({
+    "message": {"type": "string"},
+    "aside_text": _NULLABLE_STRING,
+})
+
+BATCH_ASIDE_TEXT_SCHEMA = _object({
+    "message": {"type": "string"},
+    "aside_texts": {"type": "array", "items": _NULLABLE_STRING},
+})
+
+BABY_PROFILE_SCHEMA = _object({
+    "message": {"type": "string"},
+    "baby_name": _NULLABLE_STRING,
+    "baby_name_en": _NULLABLE_STRING,
+    "gender": {"type": ["string", "null"], "enum": ["男孩", "女孩", None]},
+    "birthday": _NULLABLE_STRING,
+    "height": _NULLABLE_NUMBER,
+    "weight": _NULLABLE_NUMBER,
+    "head_circumference": _NULLABLE_NUMBER,
+    "attachment": {"anyOf": [_ATTACHMENT, {"type": "null"}]},
+})
+
+RELATIONSHIP_SCHEMA = _object({
+    "message": {"type": "string"},
+    "relation_or_identity": _NULLABLE_STRING,
+    "attachment": {"anyOf": [_ATTACHMENT, {"type": "null"}]},
+})
+
+RESPONSE_SCHEMAS = {
+    "aside_text_prompt.txt": ("aside_text", ASIDE_TEXT_SCHEMA),
+    "short_answer_prompt.txt": ("aside_text", ASIDE_TEXT_SCHEMA),
+    "letter_prompt.txt": ("aside_text", ASIDE_TEXT_SCHEMA),
+    "relationship_identity_prompt.txt": ("aside_text", ASIDE_TEXT_SCHEMA),
+    "batch_short_answer_prompt.txt": ("batch_aside_text", BATCH_ASIDE_TEXT_SCHEMA),
+    "baby_intro_prompt.txt": ("baby_profile", BABY_PROFILE_SCHEMA),
+    "relationship_identity_mission.txt": ("relationship", RELATIONSHIP_SCHEMA),
+}
+
+
+def get_response_format(prompt_file: str) -> Dict[str, Any]:
+    """Return the `text.format` for a prompt: strict json_schema if known, otherwise json_object."""
+    entry = RESPONSE_SCHEMAS.get(prompt_file)
+    if entry is None:
+        return {"type": "json_object"}
+
+    name, schema = entry
+    return {
+        "type": "json_schema",
+        "name": name,
+        "schema": schema,
+        "strict": True,
+    }
+
+
+def validate_response(data: Any, schema: Optional[Dict[str, Any]], path: str = "$") -> List[str]:
+    """Check `data` against the subset of JSON schema used above; returns a list of errors."""
+    if schema is None:
+        return [] if isinstance(data, dict) else [f"{path}: expected object"]
+
+    if "anyOf" in schema:
+        for option in schema["anyOf"]:
+            if not validate_response(data, option, path):
+                return []
+        return [f"{path}: does not match any allowed type"]
+
+    types = schema.get("type")
+    types = types if isinstance(types, list) else [types]
+    type_checks = {
+        "object": lambda v: isinstance(v, dict),
+        "array": lambda v: isinstance(v, list),
+        "string": lambda v: isinstance(v, str),
+        "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+        "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+        "null": lambda v: v is None,
+    }
+    if not any(type_checks[t](data) for t in types if t):
+        return [f"{path}: expected {' or '.join(types)}"]
+
+    if "enum" in schema and data not in schema["enum"]:
+        return [f"{path}: must be one of {schema['enum']}"]
+
+    errors = []
+    if isinstance(data, dict) and "properties" in schema:
+        for key in schema.get("required", []):
+            if key not in data:
+                errors.append(f"{path}.{key}: missing")
+        for key, value in data.items():
+            if key in schema["properties"]:
+                errors.extend(validate_response(value, schema["properties"][key], f"{path}.{key}"))
+            elif schema.get("additionalProperties") is False:
+                errors.append(f"{path}.{key}: unexpected field")
+    elif isinstance(data, list) and "items" in schema:
+        for index, item in enumerate(data):
+            errors.extend(validate_response(item, schema["items"], f"{path}[{index}]"))
+    return errors
@@ -0,0 +1,139 @@
+import os
+import re
+from functools import lru_cache
+from typing import List
+
+from bot.logger import setup_logger
+from bot.config import config
+
+# Same classes as openai_utils.unit_length: CJK ideographs are 1, punctuation and fullwidth forms 0.5
+_CJK = re.compile(r'[\u3400-\u4DBF\u4E00-\u9FFF\uF900-\uFAFF]')
+
+# Atoms that are never split: Latin words (with trailing punctuation), whitespace runs, single characters
+_ATOMS = re.compile(r"[A-Za-z0-9][A-Za-z0-9'’\-]*[.,!?;:%)\]]*|\s+|.")
+
+# Kinsoku: characters that may not start a line / may not end a line
+_NO_LINE_START = set('，。、．！？：；）」』】》〉…—～,.!?:;)]}%ー')
+_NO_LINE_END = set('（「『【《〈([{')
+
+class TextLayout:
+    """
+    Line breaking measured with the book font's glyph advances.
+
+    Widths are in em: a full-width CJK glyph is 1.0, so limits keep their
+    "characters per line" meaning while Latin text and punctuation use their
+    real widths. Advances are cached per glyph. The font is opt-in
+    (ASIDE_TEXT_FONT_PATH); without it, the old `unit_length` weights are used
+    (CJK ideographs = 1, everything else = 0.5).
+    """
+    def __init__(self, font_path=None, font_size=64):
+        self.logger = setup_logger('TextLayout')
+        self._font = None
+        self._em = 1.0
+        self._advances = {}
+        self._line_counts = lru_cache(maxsize=4096)(self._count_lines)
+
+        if font_path and os.path.exists(font_path):
+            try:
+                from PIL import ImageFont
+                self._font = ImageFont.truetype(font_path, font_size)
+                self._em = self._font.getlength('中') or font_size
+            except Exception as e:
+                self.logger.warning(f"Failed to load font {font_path}, using heuristic widths: {e}")
+                self._font = None
+        elif font_path:
+            self.logger.warning(f"Font {font_path} not found, using heuristic widths")
+        else:
+            self.logger.info("ASIDE_TEXT_FONT_PATH not set, using heuristic widths")
+
+        # Average advance of Latin text, used to convert "characters per line" limits for English
+        sample = 'abcdefghijklmnopqrstuvwxyz '
+        self.latin_advance = sum(self.advance(ch) for ch in sample) / len(sample)
+
+    def advance(self, ch: str) -> float:
+        width = self._advances.get(ch)
+        if width is None:
+            if self._font is not None:
+                width = self._font.getlength(ch) / self._em
+            else:
+                width = 1.0 if _CJK.match(ch) else 0.5
+            self._advances[ch] = width
+        return width
+
+    def measure(self, text: str) -> float:
+        advance = self.advance
+        return sum(advance(ch) for ch in text)
+
+    def wrap(self, text: str, max_width: float) -> List[str]:
+        """Break one paragraph into lines no wider than `max_width` em (closing punctuation may hang)."""
+        lines = []
+        line = []
+        width = 0.0
+
+        for atom in _ATOMS.findall(text):
+            atom_width = self.measure(atom)
+
+            if atom.isspace():
+                # Spaces are break opportunities and vanish at line edges
+                if line and width + atom_width <= max_width:
+                    line.append(atom)
+                    width += atom_width
+                elif line:
+                    lines.append(''.join(line).rstrip())
+                    line, width = [], 0.0
+                continue
+
+            if atom_width > max_width and len(atom) > 1:
+                # A single word wider than the line: split it by glyph
+                for ch in atom:
+                    ch_width = self.advance(ch)
+                    if line and width + ch_width > max_width and ch not in _NO_LINE_START:
+                        lines.append(''.join(line).rstrip())
+                        line, width = [], 0.0
+                    line.append(ch)
+                    width += ch_width
+                continue
+
+            if width + atom_width <= max_width or not line:
+                line.append(atom)
+                width += atom_width
+                continue
+
+            if atom in _NO_LINE_START:
+                # Hang closing punctuation rather than starting a line with it
+                line.append(atom)
+                width += atom_width
+                continue
+
+            # Opening brackets move to the next line with the text they open
+            carry = []
+            while line and line[-1] in _NO_LINE_END:
+                carry.insert(0, line.pop())
+            if line:
+                lines.append(''.join(line).rstrip())
+            line = carry + [atom]
+            width = self.measure(''.join(line))
+
+        if line:
+            lines.append(''.join(line).rstrip())
+        return [l for l in lines if l]
+
+    def _count_lines(self, text: str, max_width: float) -> int:
+        return len(self.layout(text, max_width))
+
+    def fits(self, text: str, max_width: float, max_lines: int) -> bool:
+        """Whether `text` wraps into at most `max_lines` lines; repeated checks are served from a cache."""
+        return self._line_counts(text, max_width) <= max_lines
+
+    def layout(self, text: str, max_width: float) -> List[str]:
+        """Wrap every paragraph of `text`, keeping the user's own line breaks."""
+        lines = []
+        for paragraph in text.replace('\r', '').split('\n'):
+            if paragraph.strip():
+                lines.extend(self.wrap(paragraph.strip(), max_width))
+        return lines
+
+@lru_cache(maxsize=None)
+def get_text_layout() -> TextLayout:
+    # One instance per process, so a missing font is reported once
+    return TextLayout(config.ASIDE_TEXT_FONT_PATH)
@@ -0,0 +1,133 @@
+import asyncio
+import io
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from bot.logger import setup_logger
+
+class TranscriptionBackend(ABC):
+    """Speech-to-text engine. Subclasses implement `_transcribe`."""
+    name = 'base'
+
+    def __init__(self):
+        self.logger = setup_logger(self.__class__.__name__)
+        self.calls = 0
+        self.failures = 0
+        self.total_latency = 0.0
+
+    async def transcribe(self, data: bytes, filename: str, language='zh', prompt=None) -> str:
+        start_time = time.monotonic()
+        self.calls += 1
+        try:
+            return await self._transcribe(data, filename, language, prompt)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.total_latency += time.monotonic() - start_time
+
+    @abstractmethod
+    async def _transcribe(self, data, filename, language, prompt) -> str:
+        ...
+
+    def stats(self):
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'avg_latency': round(self.total_latency / self.calls, 3) if self.calls else 0.0,
+        }
+
+class OpenAITranscriber(TranscriptionBackend):
+    """Remote whisper-1 through the shared, rate-limited OpenAI client."""
+    name = 'openai'
+
+    def __init__(self, openai_utils, model='whisper-1'):
+        super().__init__()
+        self.openai_utils = openai_utils
+        self.model = model
+
+    async def _transcribe(self, data, filename, language, prompt):
+        async with self.openai_utils.limited(self.model):
+            transcription = await self.openai_utils.client.audio.transcriptions.create(
+                model=self.model,
+                file=(filename, data),
+                prompt=prompt,
+                language=language,
+            )
+        return transcription.text
+
+class LocalWhisperTranscriber(TranscriptionBackend):
+    """
+    CPU-only faster-whisper engine; works without network access.
+    The package and model are loaded on first use. Optional dependency:
+    `pip install faster-whisper` (only needed for the 'local' / 'failover' backends).
+    """
+    name = 'local'
+
+    def __init__(self, model_size='small', compute_type='int8'):
+        super().__init__()
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self._model = None
+        # One worker: the model is not thread-safe and already uses all cores
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def _load_model(self):
+        if self._model is None:
+            from faster_whisper import WhisperModel
+            self.logger.info(f"Loading local whisper model '{self.model_size}'")
+            self._model = WhisperModel(self.model_size, device='cpu', compute_type=self.compute_type)
+        return self._model
+
+    def _run(self, data, language, prompt):
+        segments, _ = self._load_model().transcribe(io.BytesIO(data), language=language, initial_prompt=prompt)
+        return ''.join(segment.text for segment in segments).strip()
+
+    async def _transcribe(self, data, filename, language, prompt):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run, data, language, prompt)
+
+class FailoverTranscriber(TranscriptionBackend):
+    """Use `primary`, falling back to `fallback` when it errors or exceeds `timeout` seconds."""
+    name = 'failover'
+
+    def __init__(self, primary, fallback, timeout=20):
+        super().__init__()
+        self.primary = primary
+        self.fallback = fallback
+        self.timeout = timeout
+        self.failovers = defaultdict(int)
+
+    async def _transcribe(self, data, filename, language, prompt):
+        try:
+            return await asyncio.wait_for(self.primary.transcribe(data, filename, language, prompt), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.failovers['timeout'] += 1
+            self.logger.warning(f"{self.primary.name} transcription timed out after {self.timeout}s, using {self.fallback.name}")
+        except Exception as e:
+            self.failovers['error'] += 1
+            self.logger.warning(f"{self.primary.name} transcription failed ({e}), using {self.fallback.name}")
+        return await self.fallback.transcribe(data, filename, language, prompt)
+
+    def stats(self):
+        return {
+            **super().stats(),
+            'failovers': dict(self.failovers),
+            self.primary.name: self.primary.stats(),
+            self.fallback.name: self.fallback.stats(),
+        }
+
+def build_transcriber(openai_utils, backend, local_model='small', timeout=20):
+    """
+    backend:
+        'openai': remote whisper-1 only
+        'local': offline faster-whisper only (dev / CI)
+        'failover': remote first, local when the remote API is slow or down
+    """
+    if backend == 'local':
+        return LocalWhisperTranscriber(local_model)
+    if backend == 'failover':
+        return FailoverTranscriber(OpenAITranscriber(openai_utils), LocalWhisperTranscriber(local_model), timeout=timeout)
+    return OpenAITranscriber(openai_utils)
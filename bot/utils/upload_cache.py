@@ -0,0 +1,107 @@
+import asyncio
+import os
+import time
+from urllib.parse import urlparse, parse_qs
+
+import discord
+
+from bot.logger import setup_logger
+
+class UploadCache:
+    """
+    Remembers the CDN URL of local images that were already uploaded once.
+
+    Keyed by (path, mtime, size), so a file is uploaded again only when it
+    changes on disk or its signed URL is about to expire (`ex=` parameter).
+    """
+    def __init__(self, media_pool, max_entries=256, expiry_margin=3600):
+        self.media_pool = media_pool
+        self.max_entries = max_entries
+        self.expiry_margin = expiry_margin
+        self.logger = setup_logger('UploadCache')
+        self._entries = {}
+        self._inflight = {}
+
+        # metrics
+        self.hits = 0
+        self.uploads = 0
+        self.expired = 0
+        self.failures = 0
+
+    @staticmethod
+    def _expires_at(url):
+        ex = parse_qs(urlparse(url).query).get('ex')
+        if not ex:
+            return None
+        try:
+            return int(ex[0], 16)
+        except ValueError:
+            return None
+
+    def _valid(self, entry):
+        url, expires_at = entry
+        return expires_at is None or expires_at - self.expiry_margin > time.time()
+
+    async def get_url(self, client, file_path, filename):
+        """Return a CDN URL for `file_path`, uploading it only on first use. Raises FileNotFoundError like discord.File."""
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if self._valid(entry):
+                self.hits += 1
+                return entry[0]
+            self.expired += 1
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.create_task(self._upload(client, key, file_path, filename))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.hits += 1
+        return await asyncio.shield(task)
+
+    async def _upload(self, client, key, file_path, filename):
+        try:
+            data = await asyncio.to_thread(lambda: open(file_path, 'rb').read())
+            attachment = await self.media_pool.upload(client, data, filename)
+        except Exception:
+            self.failures += 1
+            raise
+
+        self.uploads += 1
+        # Older versions of the same file can never be requested again
+        for stale_key in [k for k in self._entries if k[0] == key[0]]:
+            del self._entries[stale_key]
+        if len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (attachment.url, self._expires_at(attachment.url))
+        return attachment.url
+
+    async def attach(self, client, embed, file_path, filename, shared=False):
+        """
+        Prepare `file_path` as the embed image and return the files to send with it.
+        Shared images are referenced by CDN URL (no upload); others are attached as before.
+        """
+        if shared:
+            try:
+                embed.set_image(url=await self.get_url(client, file_path, filename))
+                return []
+            except FileNotFoundError:
+                raise
+            except Exception as e:
+                self.logger.warning(f"Failed to reuse upload of {file_path}, attaching it instead: {e}")
+        return [discord.File(file_path, filename=filename)]
+
+    def stats(self):
+        lookups = self.hits + self.uploads
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'uploads': self.uploads,
+            'expired': self.expired,
+            'failures': self.failures,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+        }
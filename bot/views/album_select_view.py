@@ -5,6 +5,8 @@ from datetime import datetime
 
 from bot.config import config
 from bot.utils.id_utils import encode_ids
+from bot.utils.page_previews import page_export_path
+from bot.utils.page_prefetcher import PagePrefetcher
 from bot.utils.drive_file_utils import create_file_from_url, create_preview_image_from_url
 from bot.views.task_select_view import TaskSelectView
 from bot.views.theme_book_view import EditThemeBookView
@@ -379,6 +381,7 @@ class AlbumView(discord.ui.View):
         self.completed_missions = completed_missions
         self.incomplete_missions = incomplete_missions
         self.next_mission_id = None
+        self.shared_preview = False
         self.message = None
 
         if self.menu_options:
@@ -404,11 +407,11 @@ class AlbumView(discord.ui.View):
 
         try:
             if file_path:
-                file = discord.File(file_path, filename=filename)
+                files = await self.client.upload_cache.attach(self.client, embed, file_path, filename, shared=getattr(view, 'shared_preview', False))
                 if use_response:
-                    await interaction.response.edit_message(embed=embed, view=view, attachments=[file])
+                    await interaction.response.edit_message(embed=embed, view=view, attachments=files)
                 else:
-                    await interaction.edit_original_response(embed=embed, view=view, attachments=[file])
+                    await interaction.edit_original_response(embed=embed, view=view, attachments=files)
             else:
                 raise FileNotFoundError("No file_path provided")
         except FileNotFoundError:
@@ -587,8 +590,10 @@ class AlbumView(discord.ui.View):
                 baby_id = 2024000002 # 英文繪本示範寶寶ID
         else:
             baby_id = self.baby_id
+        # Demo pages are the same for every user, so their upload can be reused
+        self.shared_preview = baby_id != self.baby_id
 
-        file_path = f"/home/ubuntu/canva_exports/{baby_id}/{intro_mission_id}.jpg"
+        file_path = self.client.page_previews.resolve(page_export_path(baby_id, intro_mission_id))
         filename = f"{intro_mission_id}.jpg"
         current_page_url = f"attachment://{filename}"
         fallback_url = f"https://infancixbaby120.com/discord_image/{baby_id}/{intro_mission_id}.jpg"
@@ -643,7 +648,8 @@ class AlbumView(discord.ui.View):
         )
 
         intro_mission_id = config.book_intro_mission_map.get(self.book_id)
-        file_path = f"/home/ubuntu/canva_exports/{self.baby_id}/{intro_mission_id}.jpg"
+        self.shared_preview = False
+        file_path = self.client.page_previews.resolve(page_export_path(self.baby_id, intro_mission_id))
         filename = f"{intro_mission_id}.jpg"
         current_page_url = f"attachment://{filename}"
         fallback_url = f"https://infancixbaby120.com/discord_image/{self.baby_id}/{intro_mission_id}.jpg"
@@ -757,6 +763,7 @@ class EditGrowthBookView(discord.ui.View):
         self.mission_ids = [m['mission_id'] for m in self.submitted_missions]
         self.current_page = 0
         self.current_mission_id = self.mission_ids[self.current_page] if self.mission_ids else None
+        self.prefetcher = PagePrefetcher()
 
         # Setup buttons
         self.setup_buttons()
@@ -767,7 +774,7 @@ class EditGrowthBookView(discord.ui.View):
             self.remove_item(c)
 
     async def update_view(self, itx: discord.Interaction, update_embed: discord.Embed, file_path: str, filename: str):
-        file = discord.File(fp=file_path, filename=filename)
+        file = self.prefetcher.file(file_path, filename)
         await itx.response.edit_message(embed=update_embed, view=self, attachments=[file])
 
     def setup_buttons(self):
@@ -781,9 +788,10 @@ class EditGrowthBookView(discord.ui.View):
 
         async def prev_page(itx: discord.Interaction):
             self.current_page -= 1
-            await self.client.api_utils.update_student_current_mission(str(itx.user.id), self.mission_ids[self.current_page])
             embed, file_path, filename = self.build_preview_page(self.current_page)
             await self.update_view(itx, embed, file_path, filename)
+            # Respond first: the interaction must be answered within 3 seconds
+            await self.client.api_utils.update_student_current_mission(str(itx.user.id), self.mission_ids[self.current_page])
 
         prev_button.callback = prev_page
         self.add_item(prev_button)
@@ -807,9 +815,10 @@ class EditGrowthBookView(discord.ui.View):
 
         async def next_page(itx: discord.Interaction):
             self.current_page += 1
-            await self.client.api_utils.update_student_current_mission(str(itx.user.id), self.mission_ids[self.current_page])
             embed, file_path, filename = self.build_preview_page(self.current_page)
             await self.update_view(itx, embed, file_path, filename)
+            # Respond first: the interaction must be answered within 3 seconds
+            await self.client.api_utils.update_student_current_mission(str(itx.user.id), self.mission_ids[self.current_page])
 
         next_button.callback = next_page
         self.add_item(next_button)
@@ -876,11 +885,18 @@ class EditGrowthBookView(discord.ui.View):
         )
         embed.set_author(name=self.book_info['book_collection'])
 
-        file_path = f"/home/ubuntu/canva_exports/{self.baby_id}/{current_mission_id}.jpg"
+        file_path = self.client.page_previews.resolve(page_export_path(self.baby_id, current_mission_id))
         filename = f"{current_mission_id}.jpg"
         current_page_url = f"attachment://{filename}"
         embed.set_image(url=current_page_url)
 
+        # Load the pages ◀/▶ lead to while this one is on screen
+        self.prefetcher.prefetch([
+            self.client.page_previews.resolve(page_export_path(self.baby_id, self.mission_ids[neighbour]))
+            for neighbour in (page - 1, page + 1)
+            if 0 <= neighbour < self.total_pages
+        ])
+
         # Setup buttons again
         self.setup_buttons()
 
@@ -0,0 +1,97 @@
+import discord
+
+from bot.utils.message_tracker import delete_task_entry_record
+from bot.utils.profile_parser import parse_baby_profile, gender_form_value
+
+class BabyRegistrationModal(discord.ui.Modal):
+    """
+    One-step baby registration form.
+    Fields are validated locally; the photo is requested right after submitting.
+    """
+    def __init__(self, client, mission_id, baby_info=None, entry_view=None):
+        super().__init__(title="寶寶出生資料登記")
+        self.client = client
+        self.mission_id = mission_id
+        # The TaskSelectView holding the form button, closed once the profile is saved
+        self.entry_view = entry_view
+        baby_info = baby_info or {}
+
+        self.baby_name = discord.ui.TextInput(
+            label="🧸 暱稱（建議2-3字）",
+            default=baby_info.get('baby_name') or None,
+            max_length=10,
+        )
+        self.birthday = discord.ui.TextInput(
+            label="🎂 出生日期",
+            placeholder="例如：2025-05-01",
+            default=baby_info.get('birthday') or None,
+            max_length=20,
+        )
+        self.gender = discord.ui.TextInput(
+            label="👤 性別（男/女）",
+            placeholder="男 / 女",
+            default=gender_form_value(baby_info.get('gender')),
+            max_length=5,
+        )
+        self.growth = discord.ui.TextInput(
+            label="📏 身高、體重、頭圍（可不填）",
+            placeholder="例如：身高 50cm 體重 3200g 頭圍 34cm",
+            required=False,
+            max_length=60,
+        )
+        for item in (self.baby_name, self.birthday, self.gender, self.growth):
+            self.add_item(item)
+
+    def validate(self):
+        errors = []
+        result = {'baby_name': self.baby_name.value.strip()}
+        if not result['baby_name']:
+            errors.append("請填寫寶寶的暱稱")
+
+        birthday = parse_baby_profile(self.birthday.value) or {}
+        if set(birthday) != {'birthday'}:
+            errors.append("出生日期格式不正確，例如：2025-05-01")
+        result['birthday'] = birthday.get('birthday')
+
+        gender = parse_baby_profile(self.gender.value) or {}
+        if set(gender) != {'gender'}:
+            errors.append("性別請填寫「男」或「女」")
+        result['gender'] = gender.get('gender')
+
+        result['height'] = result['weight'] = result['head_circumference'] = None
+        if self.growth.value.strip():
+            growth = parse_baby_profile(self.growth.value) or {}
+            if not growth or not set(growth) <= {'height', 'weight', 'head_circumference'}:
+                errors.append("身高、體重、頭圍請加上單位，例如：身高 50cm 體重 3200g 頭圍 34cm")
+            result.update(growth)
+
+        return result, errors
+
+    async def on_submit(self, interaction: discord.Interaction):
+        form_result, errors = self.validate()
+        if errors:
+            await interaction.response.send_message(
+                "⚠️ " + "\n⚠️ ".join(errors) + "\n請再點一次「填寫表單」修改喔！",
+                ephemeral=True
+            )
+            return
+
+        await interaction.response.defer()
+        from bot.handlers.profile_handler import process_baby_profile_form
+        user_id = str(interaction.user.id)
+        success = await self.client.event_router.call(
+            user_id, process_baby_profile_form, self.client, interaction, self.mission_id, form_result
+        )
+        if success and self.entry_view is not None:
+            for item in self.entry_view.children:
+                item.disabled = True
+            await interaction.edit_original_response(view=self.entry_view)
+            self.entry_view.stop()
+            delete_task_entry_record(user_id, str(self.mission_id))
+
+    async def on_error(self, interaction: discord.Interaction, error: Exception):
+        self.client.logger.error(f"Baby registration form failed for {interaction.user.id}: {error}")
+        if interaction.response.is_done():
+            await interaction.followup.send("登記失敗，請稍後再試喔！")
+        else:
+            await interaction.response.send_message("登記失敗，請稍後再試喔！")
@@ -15,6 +15,7 @@ from bot.utils.message_tracker import (
     delete_mission_record
 )
 from bot.utils.id_utils import encode_ids
+from bot.utils.page_previews import page_export_path
 
 media_config = {
     'photo': '張照片',
@@ -112,7 +113,7 @@ class GrowthPhotoView(discord.ui.View):
             description=description,
             color=0xeeb2da,
         )
-        file_path = f"/home/ubuntu/canva_exports/{self.baby_id}/{self.mission_id}.jpg"
+        file_path = self.client.page_previews.resolve(page_export_path(self.baby_id, self.mission_id))
         filename = f"{self.mission_id}.jpg"
         current_page_url = f"attachment://{filename}"
         embed.set_image(url=current_page_url)
@@ -186,8 +187,8 @@ class GrowthPhotoView(discord.ui.View):
         view = AlbumView(self.client, self.user_id, book_info, completed_missions, incomplete_missions, menu_options)
         embed, file_path, filename, fallback_url = view.preview_embed()
         try:
-            file = discord.File(file_path, filename=filename)
-            await interaction.followup.send(embed=embed, view=view, file=file)
+            files = await self.client.upload_cache.attach(self.client, embed, file_path, filename, shared=view.shared_preview)
+            await interaction.followup.send(embed=embed, view=view, files=files)
         except FileNotFoundError:
             self.client.logger.warning(f"File not found: {file_path}, using fallback URL: {fallback_url}")
             embed.set_image(url=fallback_url)
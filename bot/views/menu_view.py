@@ -1,7 +1,7 @@
 import discord
 from bot.config import config
 
-from bot.utils.drive_file_utils import create_file_from_url, create_preview_image_from_url
+from bot.utils.drive_file_utils import create_preview_image_from_url, create_files_from_urls
 
 AGE_RANGES = [
     ("1–12 個月", "1-12"),
@@ -393,10 +393,6 @@ class KnowledgePostView(discord.ui.View):
 
         files = []
         if '週' in self.post_info['development_week']:
-            for url in self.post_info['milestone_image_contents'].split(','):
-                if url.strip():
-                    file = await create_file_from_url(url.strip())
-                    if file:
-                        files.append(file)
+            files = await create_files_from_urls(self.post_info['milestone_image_contents'])
 
         return embed, files
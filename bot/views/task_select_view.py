@@ -92,6 +92,16 @@ class TaskSelectView(discord.ui.View):
             self.baby_optin_button.callback = self.baby_optin_button_callback
             self.add_item(self.baby_optin_button)
 
+        if task_type == "baby_registration_form":
+            label = "📝 填寫表單"
+            self.baby_registration_form_button = discord.ui.Button(
+                custom_id="baby_registration_form_button",
+                label=label,
+                style=discord.ButtonStyle.primary
+            )
+            self.baby_registration_form_button.callback = self.baby_registration_form_button_callback
+            self.add_item(self.baby_registration_form_button)
+
         if task_type == "baby_pre_registration_confirm":
             # Confirm button
             confirm_button = discord.ui.Button(
@@ -218,7 +228,8 @@ class TaskSelectView(discord.ui.View):
         from bot.handlers.utils import start_mission_by_id
         user_id = str(interaction.user.id)
         next_mission_id = self.mission_result['next_mission_id']
-        await start_mission_by_id(self.client, user_id, next_mission_id, send_weekly_report=1)
+        # Run in the user's event lane so it doesn't race with pending DMs
+        await self.client.event_router.call(user_id, start_mission_by_id, self.client, user_id, next_mission_id, send_weekly_report=1)
     
     async def go_skip_aside_text_button_callback(self, interaction):
         await interaction.response.defer()
@@ -227,7 +238,7 @@ class TaskSelectView(discord.ui.View):
         await interaction.edit_original_response(view=self)
 
         self.client.skip_aside_text[str(interaction.user.id)] = True
-        await self.submit_image_data(interaction)
+        await self.client.event_router.call(str(interaction.user.id), self.submit_image_data, interaction)
 
     async def go_submit_button_callback(self, interaction):
         await interaction.response.defer()
@@ -235,7 +246,7 @@ class TaskSelectView(discord.ui.View):
             item.disabled = True
         await interaction.edit_original_response(view=self)
 
-        await self.submit_image_data(interaction)
+        await self.client.event_router.call(str(interaction.user.id), self.submit_image_data, interaction)
 
     async def go_skip_growth_info_button_callback(self, interaction):
         await interaction.response.defer()
@@ -276,6 +287,11 @@ class TaskSelectView(discord.ui.View):
             from bot.handlers.profile_handler import handle_baby_photo_upload
             await handle_baby_photo_upload(self.client, message, student_mission_info)
 
+    async def baby_registration_form_button_callback(self, interaction):
+        # A modal must be the first response, so no API calls before it
+        from bot.views.baby_registration_modal import BabyRegistrationModal
+        await interaction.response.send_modal(BabyRegistrationModal(self.client, self.mission_id, self.mission_result, entry_view=self))
+
     async def baby_pre_confirm_button_callback(self, interaction):
         """確認寶寶資料,提交並產生繪本"""
         await interaction.response.defer()
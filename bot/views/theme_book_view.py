@@ -5,6 +5,8 @@ import asyncio
 
 from bot.config import config
 from bot.utils.id_utils import encode_ids
+from bot.utils.page_previews import page_export_path
+from bot.utils.page_prefetcher import PagePrefetcher
 from bot.utils.message_tracker import (
     load_theme_book_edit_records,
     delete_theme_book_edit_record,
@@ -27,6 +29,7 @@ class EditThemeBookView(discord.ui.View):
         self.current_page = 0
         self.total_pages = len(THEME_BOOK_PAGES)
         self.reward = 100
+        self.prefetcher = PagePrefetcher()
 
         self.update_buttons()
 
@@ -80,11 +83,18 @@ class EditThemeBookView(discord.ui.View):
         )
         embed.set_author(name=self.book_info['book_collection'])
 
-        file_path = f"/home/ubuntu/canva_exports/{self.baby_id}/{current_mission_id}.jpg"
+        file_path = self.client.page_previews.resolve(page_export_path(self.baby_id, current_mission_id))
         filename = f"{current_mission_id}.jpg"
         current_page_url = f"attachment://{filename}"
         embed.set_image(url=current_page_url)
 
+        # Load the pages ◀/▶ lead to while this one is on screen
+        self.prefetcher.prefetch([
+            self.client.page_previews.resolve(page_export_path(self.baby_id, self.mission_list[page]))
+            for page in (self.current_page - 1, self.current_page + 1)
+            if 0 <= page < self.total_pages
+        ])
+
         return embed, file_path, filename
 
 class PreviousButton(discord.ui.Button):
@@ -105,7 +115,7 @@ class PreviousButton(discord.ui.Button):
         view.current_page = max(0, view.current_page - 1)
         embed, file_path, filename = view.get_current_embed(str(interaction.user.id))
         view.update_buttons()
-        file = discord.File(file_path, filename=filename)
+        file = view.prefetcher.file(file_path, filename)
         await interaction.edit_original_response(
             embed=embed,
             view=view,
@@ -130,7 +140,7 @@ class NextButton(discord.ui.Button):
         view.current_page = min(view.total_pages - 1, view.current_page + 1)
         embed, file_path, filename = view.get_current_embed(str(interaction.user.id))
         view.update_buttons()
-        file = discord.File(file_path, filename=filename)
+        file = view.prefetcher.file(file_path, filename)
         await interaction.edit_original_response(
             embed=embed,
             view=view,
@@ -230,13 +240,13 @@ class SubmitButton(discord.ui.Button):
         view = AlbumView(view.client, str(interaction.user.id), book_info, completed_missions, incomplete_missions, menu_options)
         embed, file_path, filename, fallback_url = view.preview_embed()
         try:
-            file = discord.File(file_path, filename=filename)
-            await interaction.followup.send(embed=embed, view=view, file=file)
+            files = await view.client.upload_cache.attach(view.client, embed, file_path, filename, shared=view.shared_preview)
+            await interaction.followup.send(embed=embed, view=view, files=files)
         except FileNotFoundError:
-            self.client.logger.warning(f"File not found: {file_path}, using fallback URL: {fallback_url}")
+            view.client.logger.warning(f"File not found: {file_path}, using fallback URL: {fallback_url}")
             embed.set_image(url=fallback_url)
             await interaction.followup.send(embed=embed, view=view)
         except Exception as e:
-            self.client.logger.error(f"Error loading album preview for book {self.book_info['book_id']}: {e}")
+            view.client.logger.error(f"Error loading album preview for book {view.book_id}: {e}")
             embed.set_image(url=fallback_url)
             await interaction.followup.send(embed=embed, view=view)
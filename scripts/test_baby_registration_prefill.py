@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Test script for the baby registration form prefill:
+stored gender codes must come back as values the form accepts
+"""
+import os
+import sys
+
+# Add the repository root to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bot.utils.profile_parser import parse_baby_profile, gender_form_value
+
+def test_gender_prefill_round_trip():
+    """A returning user's stored gender must validate without being edited"""
+    test_cases = [
+        # (stored value, expected form value, expected parsed gender)
+        ('m', '男', '男孩'),
+        ('f', '女', '女孩'),
+        ('M', '男', '男孩'),
+        ('女孩', '女孩', '女孩'),
+        (None, None, None),
+        ('x', None, None),
+    ]
+
+    print("=" * 80)
+    print("Testing gender prefill round trip")
+    print("=" * 80)
+
+    for stored, expected_value, expected_gender in test_cases:
+        value = gender_form_value(stored)
+        assert value == expected_value, f"{stored!r}: prefilled {value!r}, expected {expected_value!r}"
+
+        if expected_gender is not None:
+            # Same check as BabyRegistrationModal.validate
+            parsed = parse_baby_profile(value) or {}
+            assert parsed == {'gender': expected_gender}, f"{stored!r}: form value {value!r} parsed as {parsed}"
+        print(f"✓ {stored!r} -> {value!r}")
+
+    print("\nAll tests completed!")
+
+if __name__ == '__main__':
+    test_gender_prefill_round_trip()